@@ -1,5 +1,7 @@
-from typing import Callable, Dict, List, Any, Tuple
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Any, Optional, Set, Tuple
+from collections.abc import Mapping
 from helpers.utils import track_call_count
+import operator
 
 # This is the type definition for an Assignment
 # Basically, an assignment is a dictionary where each key-value pair represents a variable and its assigned value respectively.
@@ -13,6 +15,23 @@ class Constraint:
     def is_satisfied(self, assignment: Assignment) -> bool:
         return False
 
+    # Returns the names of the variables that are involved in this constraint.
+    def get_variables(self) -> Tuple[str, ...]:
+        return ()
+
+    # The following two functions are only used by constraints that involve more than two variables (global constraints)
+    # since they can reduce the domains on their own (unary and binary constraints are handled by the solver).
+    # Both functions receive the domains of the unassigned variables and a function "prune(variable, values)" that removes
+    # the given values from the domain of the given variable, and they return False if the constraint can no longer be satisfied.
+
+    # This function is called after one of the constraint's variables is assigned a value.
+    def forward_check(self, assigned_variable: str, assigned_value: Any, domains: Dict[str, Any], prune: Callable[[str, List[Any]], None]) -> bool:
+        return True
+
+    # This function is called whenever the domains of the constraint's variables may need to be reduced.
+    def propagate(self, domains: Dict[str, Any], prune: Callable[[str, List[Any]], None]) -> bool:
+        return True
+
 # This is a class for unary constraints (constraints involving one variable only).
 class UnaryConstraint(Constraint):
     variable: str  # The name of the variable that is in the constraint.
@@ -31,6 +50,9 @@ class UnaryConstraint(Constraint):
         if value is None: return False
         return self.condition(value)
 
+    def get_variables(self) -> Tuple[str, ...]:
+        return (self.variable,)
+
 # This is a class for binary constraints (constraints involving two variable only).
 class BinaryConstraint(Constraint):
     variables: Tuple[str, str]  # The name of the two variables that are in the constraint.
@@ -49,6 +71,9 @@ class BinaryConstraint(Constraint):
         value1, value2 = assignment.get(variable1), assignment.get(variable2)
         if value1 is None or value2 is None: return False
         return self.condition(value1, value2)
+
+    def get_variables(self) -> Tuple[str, ...]:
+        return self.variables
     
     # Given the name of a variable in the constraint, this function returns the other variable.
     # For example, if the constraint contains the variables A & B, this function will return A if given B, and will return B if given A.
@@ -57,12 +82,429 @@ class BinaryConstraint(Constraint):
         variable1, variable2 = self.variables
         return variable2 if variable == variable1 else variable1
 
+# The built-in constraint kinds below are described by data only (their variables and values) instead of arbitrary functions,
+# so they can be pickled (e.g. to send a problem to other processes or to save it) and the solver can reduce the domains
+# with set operations instead of testing every value (see "restrict" and "conflicts").
+
+# The variable's value must be in the given set of values.
+class InSet(UnaryConstraint):
+    values: FrozenSet[Any]
+
+    def __init__(self, variable: str, values: Iterable[Any]) -> None:
+        self.values = frozenset(values)
+        super().__init__(variable, self.values.__contains__)
+
+    def __reduce__(self):
+        return InSet, (self.variable, self.values)
+
+    # Returns the values of the domain that satisfy the constraint.
+    def restrict(self, domain: Iterable[Any]) -> Set[Any]:
+        return set(domain).intersection(self.values)
+
+# The variable's value must not be in the given set of values.
+class NotInSet(UnaryConstraint):
+    values: FrozenSet[Any]
+
+    def __init__(self, variable: str, values: Iterable[Any]) -> None:
+        self.values = frozenset(values)
+        super().__init__(variable, lambda value: value not in self.values)
+
+    def __reduce__(self):
+        return NotInSet, (self.variable, self.values)
+
+    # Returns the values of the domain that satisfy the constraint.
+    def restrict(self, domain: Iterable[Any]) -> Set[Any]:
+        return set(domain).difference(self.values)
+
+# The base class of the built-in binary constraint kinds. The condition is a function of the operator module,
+# so the constraints of the same kind share their condition (and their support tables, see CompiledProblem).
+class BinaryRelation(BinaryConstraint):
+    relation: Callable[[Any, Any], bool]    # The condition of the constraint (given the values of the first and the second variables)
+    converse: Callable[[Any, Any], bool]    # The same condition with its arguments swapped
+
+    def __init__(self, variables: Tuple[str, str]) -> None:
+        super().__init__(tuple(variables), type(self).relation)
+
+    def __reduce__(self):
+        return type(self), (self.variables,)
+
+    # Given that the given variable takes the given value, returns the values in the domain of the other variable that violate the constraint.
+    def conflicts(self, variable: str, value: Any, domain: Iterable[Any]) -> List[Any]:
+        condition = self.condition if variable == self.variables[0] else self.converse
+        return [other_value for other_value in domain if not condition(value, other_value)]
+
+# The two variables must take different values.
+class NotEqual(BinaryRelation):
+    relation = converse = staticmethod(operator.ne)
+
+    # Only the value itself conflicts with it.
+    def conflicts(self, variable: str, value: Any, domain: Iterable[Any]) -> List[Any]:
+        return [value] if value in domain else []
+
+# The two variables must take the same value.
+class Equal(BinaryRelation):
+    relation = converse = staticmethod(operator.eq)
+
+    def conflicts(self, variable: str, value: Any, domain: Iterable[Any]) -> List[Any]:
+        return [other_value for other_value in domain if other_value != value]
+
+# The value of the first variable must be less than the value of the second one.
+class LessThan(BinaryRelation):
+    relation = staticmethod(operator.lt)
+    converse = staticmethod(operator.gt)
+
+    def conflicts(self, variable: str, value: Any, domain: Iterable[Any]) -> List[Any]:
+        if variable == self.variables[0]:
+            return [other_value for other_value in domain if other_value <= value]
+        return [other_value for other_value in domain if other_value >= value]
+
+# This is a class for the AllDifferent global constraint (all its variables must take different values).
+# A single AllDifferent constraint replaces all the pairwise "not equal" binary constraints between its variables,
+# and it can reduce the domains on its own:
+#   - Naked singles: if a variable has only one possible value, this value is removed from the domains of the other variables.
+#   - Hidden singles: if the number of possible values equals the number of unassigned variables, every value must be used,
+#     so if a value can only be taken by one variable, this variable must take it.
+#   - If "matching" is True, the hidden singles are replaced by the matching-based filtering of Régin (1994) which removes
+#     every value that does not belong to any maximum matching between the variables and the values (this is the strongest filtering for AllDifferent).
+# IMPORTANT: The propagation only looks at the domains of the unassigned variables, so it relies on the solver removing the value of
+#            an assigned variable from the domains of the other variables (this is done by "forward_check").
+class AllDifferentConstraint(Constraint):
+    variables: Tuple[str, ...]  # The names of the variables that are in the constraint.
+    matching: bool              # Whether to use the matching-based filtering instead of the hidden singles.
+
+    def __init__(self, variables: Iterable[str], matching: bool = False) -> None:
+        super().__init__()
+        self.variables = tuple(variables)
+        self.matching = matching
+
+    # The assignment satisfies the constraint if all the variables are assigned and their values are different.
+    def is_satisfied(self, assignment: Assignment) -> bool:
+        values = [assignment.get(variable) for variable in self.variables]
+        if any(value is None for value in values): return False
+        return len(set(values)) == len(values)
+
+    def get_variables(self) -> Tuple[str, ...]:
+        return self.variables
+
+    # The assigned value can not be taken by any other variable.
+    def forward_check(self, assigned_variable: str, assigned_value: Any, domains: Dict[str, Any], prune: Callable[[str, List[Any]], None]) -> bool:
+        for variable in self.variables:
+            domain = domains.get(variable)
+            if domain is not None and assigned_value in domain:
+                prune(variable, [assigned_value])
+                if not domain: return False
+        return True
+
+    def propagate(self, domains: Dict[str, Any], prune: Callable[[str, List[Any]], None]) -> bool:
+        variables = [variable for variable in self.variables if variable in domains]
+        while True:
+            if not self._naked_singles(variables, domains, prune): return False
+            if self.matching:
+                return self._filter_by_matching(variables, domains, prune)
+            changed = self._hidden_singles(variables, domains, prune)
+            if changed is None: return False
+            if not changed: return True
+
+    def _naked_singles(self, variables: List[str], domains: Dict[str, Any], prune: Callable[[str, List[Any]], None]) -> bool:
+        singles = [variable for variable in variables if len(domains[variable]) <= 1]
+        while singles:
+            single = singles.pop()
+            domain = domains[single]
+            if not domain: return False
+            value = next(iter(domain))
+            for variable in variables:
+                other_domain = domains[variable]
+                if variable != single and value in other_domain:
+                    prune(variable, [value])
+                    if len(other_domain) <= 1: singles.append(variable)
+        return True
+
+    # Returns whether any domain was reduced, or None if the constraint can not be satisfied.
+    def _hidden_singles(self, variables: List[str], domains: Dict[str, Any], prune: Callable[[str, List[Any]], None]) -> Optional[bool]:
+        places: Dict[Any, List[str]] = {}
+        for variable in variables:
+            for value in domains[variable]:
+                places.setdefault(value, []).append(variable)
+        if len(places) < len(variables): return None # there are not enough values for the variables
+        if len(places) > len(variables): return False
+        changed = False
+        for value, (variable, *others) in places.items():
+            if others: continue
+            domain = domains[variable]
+            if value not in domain: return None # the variable is already forced to take another hidden single
+            if len(domain) == 1: continue
+            prune(variable, [other_value for other_value in domain if other_value != value])
+            changed = True
+        return changed
+
+    def _filter_by_matching(self, variables: List[str], domains: Dict[str, Any], prune: Callable[[str, List[Any]], None]) -> bool:
+        # Find a maximum matching between the variables and the values using augmenting paths.
+        matched_variable: Dict[Any, str] = {} # the variable matched to each value
+        matched_value: Dict[str, Any] = {}    # the value matched to each variable
+        def augment(variable: str, visited: set) -> bool:
+            for value in domains[variable]:
+                if value in visited: continue
+                visited.add(value)
+                owner = matched_variable.get(value)
+                if owner is None or augment(owner, visited):
+                    matched_variable[value] = variable
+                    matched_value[variable] = value
+                    return True
+            return False
+        for variable in variables:
+            if not augment(variable, set()): return False # some variables can not take different values
+        
+        # Build the directed graph where the matching edges go from the variables to the values
+        # and the other edges go from the values to the variables. The nodes are numbered (variables first then values).
+        value_index = {value: len(variables) + index for index, value in enumerate({value for variable in variables for value in domains[variable]})}
+        successors: List[List[int]] = [[value_index[matched_value[variable]]] for variable in variables]
+        successors.extend([] for _ in value_index)
+        for index, variable in enumerate(variables):
+            for value in domains[variable]:
+                if value != matched_value[variable]:
+                    successors[value_index[value]].append(index)
+        
+        # An edge belongs to some maximum matching if it is in the matching, or it is on an alternating path that starts
+        # at a free (unmatched) value, or its two nodes are in the same strongly connected component (an alternating cycle).
+        reachable = [False] * len(successors)
+        stack = [index for value, index in value_index.items() if value not in matched_variable]
+        for index in stack: reachable[index] = True
+        while stack:
+            for successor in successors[stack.pop()]:
+                if not reachable[successor]:
+                    reachable[successor] = True
+                    stack.append(successor)
+        component = _strongly_connected_components(successors)
+        
+        for index, variable in enumerate(variables):
+            removed = [value for value in domains[variable] 
+                if value != matched_value[variable] and not reachable[value_index[value]] and component[value_index[value]] != component[index]]
+            if removed: prune(variable, removed)
+        return True
+
+# Returns the strongly connected component of each node in a directed graph given as a list of successors (Tarjan's algorithm).
+def _strongly_connected_components(successors: List[List[int]]) -> List[int]:
+    count = len(successors)
+    index, lowlink, component = [-1] * count, [0] * count, [-1] * count
+    stack, on_stack = [], [False] * count
+    counter, components = 0, 0
+    for root in range(count):
+        if index[root] != -1: continue
+        work = [(root, 0)]
+        while work:
+            node, child = work.pop()
+            if child == 0:
+                index[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            elif child <= len(successors[node]):
+                lowlink[node] = min(lowlink[node], lowlink[successors[node][child-1]])
+            while child < len(successors[node]):
+                successor = successors[node][child]
+                child += 1
+                if index[successor] == -1:
+                    work.append((node, child))
+                    work.append((successor, 0))
+                    break
+                if on_stack[successor]:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                if lowlink[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = components
+                        if member == node: break
+                    components += 1
+    return component
+
+# Counts the set bits in an integer (int.bit_count is only available since python 3.10).
+popcount: Callable[[int], int] = getattr(int, "bit_count", None) or (lambda mask: bin(mask).count("1"))
+
+# A compact domain for small non-negative integer values (such as the values 1..N of a sudoku cell).
+# The domain is stored as an integer bitmask where bit "v" is set if the value "v" is in the domain.
+# It supports the set operations used by the solver (len, in, iteration, add, remove, discard, update, copy),
+# so it can be used in place of a set inside a domains dictionary. Copying it and checking if it is empty take constant time.
+# Iterating over it yields the values in ascending order.
+class BitDomain:
+    __slots__ = ("mask",)
+    mask: int
+
+    # The largest value that can be stored in a BitDomain (to avoid accidentally allocating huge masks).
+    MAX_VALUE = 1023
+
+    def __init__(self, values: Iterable[int] = ()) -> None:
+        mask = 0
+        for value in values:
+            mask |= 1 << value
+        self.mask = mask
+
+    # Create a domain directly from a bitmask.
+    @staticmethod
+    def from_mask(mask: int) -> 'BitDomain':
+        domain = BitDomain()
+        domain.mask = mask
+        return domain
+
+    # Returns True if all the given values can be stored in a BitDomain.
+    @staticmethod
+    def can_hold(values: Iterable[Any]) -> bool:
+        return all(type(value) is int and 0 <= value <= BitDomain.MAX_VALUE for value in values)
+
+    def __len__(self) -> int:
+        return popcount(self.mask)
+
+    def __bool__(self) -> bool:
+        return self.mask != 0
+
+    def __iter__(self) -> Iterator[int]:
+        mask = self.mask
+        while mask:
+            lowest = mask & -mask
+            yield lowest.bit_length() - 1
+            mask ^= lowest
+
+    def __contains__(self, value: Any) -> bool:
+        return type(value) is int and value >= 0 and (self.mask >> value) & 1 == 1
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, BitDomain):
+            return self.mask == other.mask
+        if isinstance(other, (set, frozenset)):
+            return self.to_set() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"BitDomain({{{', '.join(str(value) for value in self)}}})"
+
+    def __copy__(self) -> 'BitDomain':
+        return BitDomain.from_mask(self.mask)
+
+    def __deepcopy__(self, memo) -> 'BitDomain':
+        return BitDomain.from_mask(self.mask)
+
+    def copy(self) -> 'BitDomain':
+        return BitDomain.from_mask(self.mask)
+
+    def add(self, value: int) -> None:
+        self.mask |= 1 << value
+
+    # Removes a value from the domain. Like sets, it raises a KeyError if the value is not in the domain.
+    def remove(self, value: int) -> None:
+        if value not in self: raise KeyError(value)
+        self.mask ^= 1 << value
+
+    def discard(self, value: int) -> None:
+        if value in self: self.mask ^= 1 << value
+
+    def update(self, values: Iterable[int]) -> None:
+        if type(values) is BitDomain:
+            self.mask |= values.mask
+            return
+        for value in values:
+            self.mask |= 1 << value
+
+    # Returns the smallest value in the domain (the domain must not be empty).
+    def min(self) -> int:
+        mask = self.mask
+        if mask == 0: raise ValueError("min() of an empty domain")
+        return (mask & -mask).bit_length() - 1
+
+    def to_set(self) -> set:
+        return set(self)
+
+# Converts the domains to BitDomains wherever the domain values allow it (the other domains are copied as sets).
+# The given dictionary is not modified.
+def to_bit_domains(domains: Dict[str, Any]) -> Dict[str, Any]:
+    return {variable: BitDomain(domain) if BitDomain.can_hold(domain) else set(domain) for variable, domain in domains.items()}
+
 # This defines a generic CSP problem
+# The problem keeps an index from each variable to the constraints that involve it, so that the solver only visits the relevant arcs.
+# The index is rebuilt whenever the constraint list is replaced (e.g. "problem.constraints = [...]"),
+# and it is kept up to date by "add_constraint" and "remove_constraint". So, do not modify the constraint list in-place.
 class Problem:
     variables: List[str]            # A list of the variable names in the problem
     domains: Dict[str, set]         # A dictionary containing the domain of each variable.
                                     # The domain is a set of values that the variable can take. 
-    constraints: List[Constraint]   # A list of constraints in the problem.
+                                    # (A BitDomain can be used instead of a set for small integer values).
+
+    # A list of constraints in the problem.
+    @property
+    def constraints(self) -> List[Constraint]:
+        return self._constraints
+
+    @constraints.setter
+    def constraints(self, constraints: List[Constraint]) -> None:
+        self._constraints = constraints
+        # the compiled view does not depend on the unary constraints, so it is kept if only they changed (e.g. by "one_consistency")
+        compiled = getattr(self, "_compiled", None)
+        if compiled is not None and compiled.constraints != [constraint for constraint in constraints if not isinstance(constraint, UnaryConstraint)]:
+            self._compiled = None
+        self._constraints_of: Dict[str, List[Constraint]] = {}
+        self._arcs: Dict[str, List[Tuple[str, BinaryConstraint]]] = {}
+        self._global_constraints_of: Dict[str, List[Constraint]] = {}
+        for constraint in constraints:
+            self._index_constraint(constraint)
+
+    # Adds a constraint to the problem and its variables' entries in the index.
+    def add_constraint(self, constraint: Constraint) -> None:
+        self._constraints.append(constraint)
+        self._compiled = None
+        self._index_constraint(constraint)
+
+    # Removes a constraint from the problem and from its variables' entries in the index.
+    def remove_constraint(self, constraint: Constraint) -> None:
+        self._constraints.remove(constraint)
+        self._compiled = None
+        for variable in constraint.get_variables():
+            self._constraints_of[variable].remove(constraint)
+        if isinstance(constraint, BinaryConstraint):
+            for variable in constraint.variables:
+                self._arcs[variable].remove((constraint.get_other(variable), constraint))
+        elif not isinstance(constraint, UnaryConstraint):
+            for variable in constraint.get_variables():
+                self._global_constraints_of[variable].remove(constraint)
+
+    # Returns all the constraints that involve the given variable.
+    def get_constraints(self, variable: str) -> List[Constraint]:
+        return self._constraints_of.get(variable, [])
+
+    # Returns the binary constraints that involve the given variable as a list of (other variable, constraint) pairs.
+    def get_arcs(self, variable: str) -> List[Tuple[str, BinaryConstraint]]:
+        return self._arcs.get(variable, [])
+
+    # Returns the constraints that involve the given variable and more than two variables (e.g. AllDifferentConstraint).
+    def get_global_constraints(self, variable: str) -> List[Constraint]:
+        return self._global_constraints_of.get(variable, [])
+
+    # Returns the variables that share at least one binary constraint with the given variable (without duplicates).
+    def get_neighbors(self, variable: str) -> List[str]:
+        return list(dict.fromkeys(other for other, _ in self.get_arcs(variable)))
+
+    # Returns the compiled (integer indexed) view of the problem that is used by the solver (see CompiledProblem).
+    # It is cached and rebuilt when the constraints or the list of variables change.
+    def compile(self) -> 'CompiledProblem':
+        compiled = getattr(self, "_compiled", None)
+        if compiled is None or compiled.variables != self.variables:
+            compiled = self._compiled = CompiledProblem(self)
+        return compiled
+
+    def _index_constraint(self, constraint: Constraint) -> None:
+        if isinstance(constraint, BinaryConstraint):
+            first, second = constraint.variables
+            self._constraints_of.setdefault(first, []).append(constraint)
+            self._constraints_of.setdefault(second, []).append(constraint)
+            self._arcs.setdefault(first, []).append((second, constraint))
+            self._arcs.setdefault(second, []).append((first, constraint))
+            return
+        for variable in constraint.get_variables():
+            self._constraints_of.setdefault(variable, []).append(constraint)
+        if not isinstance(constraint, UnaryConstraint):
+            for variable in constraint.get_variables():
+                self._global_constraints_of.setdefault(variable, []).append(constraint)
 
     # Returns True if the assignment is complete (all the variables has an value in the given assignment).
     @track_call_count
@@ -72,3 +514,132 @@ class Problem:
     # Return True if the assignment satisfies all the constraints.
     def satisfies_constraints(self, assignment: Assignment) -> bool:
         return all(constraint.is_satisfied(assignment) for constraint in self.constraints)
+
+# Returns a function check(value, other value) that tells if the binary constraint is satisfied
+# when the given variable takes the first value and the other variable takes the second one.
+# For plain binary constraints, the condition is called directly (without building an assignment dictionary).
+def binary_check(constraint: BinaryConstraint, variable: str) -> Callable[[Any, Any], bool]:
+    other = constraint.get_other(variable)
+    if type(constraint).is_satisfied is BinaryConstraint.is_satisfied:
+        condition = constraint.condition
+        if variable == constraint.variables[0]: return condition
+        if isinstance(constraint, BinaryRelation): return constraint.converse
+        return lambda value, other_value: condition(other_value, value)
+    return lambda value, other_value: constraint.is_satisfied({variable: value, other: other_value})
+
+# A support table of a binary constraint (from the side of one of its variables) over a universe of small integer values.
+# The entry of each value "v" of the universe is a bitmask of the values of the other variable that satisfy the constraint with "v"
+# (the entries of the values outside the universe are None).
+# So the supports of a value in the domain of the other variable are "table[v] & other_domain.mask" (see BitDomain).
+SupportTable = List[Optional[int]]
+
+# Builds the support table of a check function "check(value, other value)" over the given (sorted) values.
+def support_table(check: Callable[[Any, Any], bool], values: List[int]) -> SupportTable:
+    table = [None] * (values[-1] + 1)
+    for value in values:
+        mask = 0
+        for other_value in values:
+            if check(value, other_value): mask |= 1 << other_value
+        table[value] = mask
+    return table
+
+# A compiled view of a problem where every variable is interned to a dense integer id (its index in "names").
+# The ids follow the order of "problem.variables" (the variables that only appear in constraints come after them),
+# so visiting the ids in increasing order visits the variables in the same order as "problem.variables".
+# The solver keeps its domains in lists indexed by these ids, so its inner loops do not hash or compare variable names.
+# The global constraints still work with variable names (see "Constraint.forward_check").
+# If all the values in the problem's domains are small integers (see BitDomain), every binary constraint is also tabulated
+# into a support table over these values (the universe). The constraints that share the same condition share the same table,
+# so the "not equal" constraints of a sudoku are evaluated only once per pair of values. A table can only be used with BitDomains
+# whose values are all in the universe (see "covers"), otherwise the solver falls back to the check functions.
+class CompiledProblem:
+    variables: List[str]    # A copy of "problem.variables" when the problem was compiled
+    constraints: List[Constraint]   # The binary and global constraints of the problem when it was compiled (in the same order)
+    names: List[str]        # The name of each variable id
+    ids: Dict[str, int]     # The id of each variable name
+    # For each variable id, its binary constraints as (other variable id, check, constraint, table)
+    # where "check(value, other value)" tells if the two values satisfy the constraint and "table" is its support table (or None).
+    arcs: List[List[Tuple[int, Callable[[Any, Any], bool], BinaryConstraint, Optional[SupportTable]]]]
+    checks: Dict[Tuple[BinaryConstraint, int], Callable[[Any, Any], bool]]   # The check of each binary constraint from the side of each of its variable ids
+    tables: Dict[Tuple[BinaryConstraint, int], SupportTable]                # The support table of each binary constraint from the side of each of its variable ids
+    universe: int                               # A bitmask of the values covered by the support tables (0 if there are no tables)
+    neighbors: List[List[int]]                  # For each variable id, the ids of the variables that share a binary constraint with it
+    global_constraints: List[List[Constraint]]  # For each variable id, its constraints that involve more than two variables
+
+    # The maximum number of values in the universe of the support tables (each table has one bitmask per value).
+    MAX_TABLE_VALUES = 256
+
+    def __init__(self, problem: Problem) -> None:
+        self.variables = list(problem.variables)
+        self.constraints = [constraint for constraint in problem.constraints if not isinstance(constraint, UnaryConstraint)]
+        self.names = list(dict.fromkeys([*problem.variables, *(variable for constraint in problem.constraints for variable in constraint.get_variables())]))
+        self.ids = {name: index for index, name in enumerate(self.names)}
+        self.checks = {}
+        for constraint in problem.constraints:
+            if isinstance(constraint, BinaryConstraint):
+                for variable in constraint.variables:
+                    self.checks[(constraint, self.ids[variable])] = binary_check(constraint, variable)
+        self.tables, self.universe = {}, 0
+        universe = set()
+        for domain in getattr(problem, "domains", {}).values():
+            universe.update(domain)
+        if universe and len(universe) <= CompiledProblem.MAX_TABLE_VALUES and BitDomain.can_hold(universe):
+            self._tabulate(sorted(universe))
+        self.arcs = [[(self.ids[other], self.checks[(constraint, index)], constraint, self.tables.get((constraint, index))) 
+            for other, constraint in problem.get_arcs(name)] for index, name in enumerate(self.names)]
+        self.neighbors = [list(dict.fromkeys(other for other, _, _, _ in arcs)) for arcs in self.arcs]
+        self.global_constraints = [problem.get_global_constraints(name) for name in self.names]
+
+    # Returns True if the support tables can be used with the given domain.
+    def covers(self, domain: Any) -> bool:
+        return type(domain) is BitDomain and self.universe != 0 and domain.mask & ~self.universe == 0
+
+    # Builds the support tables of the binary constraints over the given values.
+    # The plain binary constraints are keyed by their condition (and the side), so the constraints that share a condition share a table.
+    def _tabulate(self, values: List[int]) -> None:
+        shared = {}
+        for (constraint, index), check in self.checks.items():
+            if type(constraint).is_satisfied is BinaryConstraint.is_satisfied:
+                key = (constraint.condition, self.names[index] == constraint.variables[0])
+            else:
+                key = (constraint, index)
+            table = shared.get(key)
+            if table is None:
+                table = shared[key] = support_table(check, values)
+            self.tables[(constraint, index)] = table
+        self.universe = BitDomain(values).mask
+
+    # Converts a dictionary of domains (keyed by variable names) to a list indexed by variable ids (None for missing variables).
+    # The domain objects are shared, so reducing a domain in the list also reduces it in the dictionary.
+    def domain_list(self, domains: Dict[str, Any]) -> List[Optional[Any]]:
+        return [domains.get(name) for name in self.names]
+
+# A read-only view of a list of domains indexed by variable ids that can be used as a dictionary keyed by variable names
+# (the variables whose domain is None are treated as missing). It is given to the global constraints.
+class NamedDomains(Mapping):
+    __slots__ = ("ids", "domains")
+
+    def __init__(self, compiled: CompiledProblem, domains: List[Optional[Any]]) -> None:
+        self.ids = compiled.ids
+        self.domains = domains
+
+    def __getitem__(self, variable: str) -> Any:
+        index = self.ids.get(variable)
+        domain = None if index is None else self.domains[index]
+        if domain is None: raise KeyError(variable)
+        return domain
+
+    def get(self, variable: str, default: Any = None) -> Any:
+        index = self.ids.get(variable)
+        domain = None if index is None else self.domains[index]
+        return default if domain is None else domain
+
+    def __contains__(self, variable: Any) -> bool:
+        index = self.ids.get(variable)
+        return index is not None and self.domains[index] is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, index in self.ids.items() if self.domains[index] is not None)
+
+    def __len__(self) -> int:
+        return sum(domain is not None for domain in self.domains)
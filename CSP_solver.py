@@ -1,8 +1,51 @@
-from typing import Any, Dict, List, Optional
-from CSP import Assignment, BinaryConstraint, Problem, UnaryConstraint
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from CSP import Assignment, BinaryConstraint, BinaryRelation, BitDomain, CompiledProblem, Constraint, InSet, NamedDomains, NotInSet, Problem, SupportTable, UnaryConstraint, popcount, to_bit_domains
 from helpers.utils import NotImplemented
+from helpers.mt19937 import RandomGenerator
 from heapq import *
-import copy
+from collections import deque
+from dataclasses import dataclass
+import itertools, math, time
+from bisect import bisect_right
+
+# A trail is an undo log of the domain reductions done during the search.
+# Each entry is a pair (domain, removed values) and undoing it adds the removed values back to the domain using its "update" method
+# (so any container with an "update" method can be recorded, e.g. AC-2001 records (dictionary, old items) to restore its supports).
+# So the cost of undoing a search node is proportional to the number of values it pruned (not to the problem size).
+Trail = List[Tuple[Any, List[Any]]]
+
+# Inside the search, the domains are a list indexed by the variable ids of the compiled problem (see CompiledProblem)
+# where the domain of an assigned variable is None.
+Domains = List[Optional[Any]]
+
+# Undo all the domain reductions that were recorded on the trail after the given mark
+# (the mark is the length of the trail before the reductions were done).
+def undo_trail(trail: Trail, mark: int) -> None:
+    while len(trail) > mark:
+        domain, removed = trail.pop()
+        domain.update(removed)
+
+# Removes the given values from the domain and records the reduction on the trail. Returns True if any value was removed.
+def _prune(domain: Any, removed: List[Any], trail: Optional[Trail]) -> bool:
+    if not removed: return False
+    for value in removed:
+        domain.discard(value)
+    if trail is not None:
+        trail.append((domain, removed))
+    return True
+
+# Removes the values in the given bitmask (which must be a subset of the domain) from a BitDomain and records the reduction on the trail.
+def _prune_mask(domain: BitDomain, mask: int, trail: Optional[Trail]) -> None:
+    domain.mask ^= mask
+    if trail is not None:
+        trail.append((domain, BitDomain.from_mask(mask)))
+
+# Returns the bitmask of the values outside the universe of the support tables if the given value is in the universe
+# (so "domain.mask & outside == 0" tells if the tables of the value can be used with a BitDomain), or None if the value is not in the universe.
+def _outside_universe(compiled: CompiledProblem, value: Any) -> Optional[int]:
+    universe=compiled.universe
+    if universe and type(value) is int and value >= 0 and (universe >> value) & 1: return ~universe
+    return None
 
 # This function should apply 1-Consistency to the problem.
 # In other words, it should modify the domains to only include values that satisfy their variables' unary constraints.
@@ -13,7 +56,9 @@ def one_consistency(problem: Problem) -> bool:
     #define a list that will hold the constraints by the end of the loop without the unary constraints
     constr_without_unary=[]  
     for constr in problem.constraints:
-        if constr.__class__ is UnaryConstraint:  #checking that this constraint is unary to be able to work on
+        if isinstance(constr,(InSet,NotInSet)):  #the built-in unary constraints reduce the domain with a set operation
+            problem.domains[constr.variable]=constr.restrict(problem.domains[constr.variable])
+        elif constr.__class__ is UnaryConstraint:  #checking that this constraint is unary to be able to work on
             var=constr.variable
             a=dict() 
             s=problem.domains[var]
@@ -50,39 +95,52 @@ def one_consistency(problem: Problem) -> bool:
 #   - If any variable's domain becomes empty, return False. Otherwise, return True.
 # IMPORTANT: Don't use the domains inside the problem, use and modify the ones given by the "domains" argument 
 #            since they contain the current domains of unassigned variables only.
-def forward_checking(problem: Problem, assigned_variable: str, assigned_value: Any, domains: Dict[str, set]) -> bool:
+# If a trail is given, every domain reduction is recorded on it so that it can be undone later using "undo_trail".
+def forward_checking(problem: Problem, assigned_variable: str, assigned_value: Any, domains: Dict[str, set], trail: Optional[Trail] = None) -> bool:
     #TODO: ADD YOUR CODE HERE
 
+    #the solver works on the compiled problem (variables are integer ids and domains are lists indexed by them),
+    #the domain objects are shared between the dictionary and the list so the given domains are modified in-place
+    compiled=problem.compile()
+    return _forward_checking(compiled, compiled.ids[assigned_variable], assigned_value, compiled.domain_list(domains), trail)
+
+# Forward checking on the compiled problem (see "forward_checking"). The domains are a list indexed by variable ids (None for the assigned variables).
+def _forward_checking(compiled: CompiledProblem, assigned_variable: int, assigned_value: Any, domains: Domains, trail: Optional[Trail] = None) -> bool:
     #no need to check if the constraint is binary or not because we already removed all unary constraints in the one_consistency function
-    for constr in problem.constraints:
-        #checking if the assigned variable is one of the 2 variables in the constraint
-            if constr.variables[0]==assigned_variable or constr.variables[1]==assigned_variable:
-                othervar=constr.get_other(assigned_variable) #getting the other variable in the constraint
-                keys=domains.keys()
-                if othervar in keys:  #checking that the other variable has domian (not assigned yet)
-                    s=domains[othervar]
-                    a=dict()
-                    bol=0
-                    new_set=set()
-                    for i in s:
-                        #adding the assigned variable with its assigned value and the other variable with one of its
-                        #values from the domain to an assignment dictionary to check if constraint is satisfied or not
-                        a[assigned_variable]=assigned_value
-                        a[othervar]=i
-                        bol=constr.is_satisfied(a)
-                        #if this value satisfies constraint, then add it to a new set of domains 
-                        if bol!=0:
-                            new_set.add(i)  
-                    #assign this new set that holds only the values that satisfy the constraint
-                    # to the domain of the variable in the main problem
-                    domains[othervar]=new_set 
-    #checking if any domain of any variable after updates became empty then return false, else return true (same as one consistensy function)
-    dom_flag=True
-    dom_lis=domains.values()
-    for dom in dom_lis:
-        if len(dom)==0:
-            dom_flag=False
-    return dom_flag
+    #the compiled problem gives us only the binary constraints that involve the assigned variable (with the other variable in each one)
+    #and the check function of each one takes the assigned value and a value of the other variable (so no assignment dictionary is needed)
+    outside=_outside_universe(compiled, assigned_value)
+    for othervar, check, constraint, table in compiled.arcs[assigned_variable]:
+        s=domains[othervar]
+        if s is None:  #the other variable has no domain (it is already assigned) so skip this constraint
+            continue
+        if table is not None and outside is not None and type(s) is BitDomain and not s.mask & outside:
+            #the support table gives the values that are compatible with the assigned value as a bitmask, so the others are removed at once
+            conflicts=s.mask & ~table[assigned_value]
+            if conflicts:
+                _prune_mask(s, conflicts, trail)
+        else:
+            if isinstance(constraint, BinaryRelation):  #the built-in binary constraints find the conflicting values directly
+                removed=constraint.conflicts(compiled.names[assigned_variable], assigned_value, s)
+            else:
+                removed=[i for i in s if not check(assigned_value, i)]
+            #remove the values that do not satisfy the constraint from the domain in-place
+            #(this works for both sets and BitDomains, so the domain keeps its type)
+            _prune(s, removed, trail)
+        #only the domains that we prune can become empty, so we only need to check this domain (and stop early if it is empty)
+        if not s:
+            return False
+    #the constraints that involve more than two variables (global constraints such as AllDifferent) reduce the domains on their own
+    constraints=compiled.global_constraints[assigned_variable]
+    if constraints:
+        ids=compiled.ids
+        named_domains=NamedDomains(compiled, domains)
+        prune=lambda variable, values: _prune(domains[ids[variable]], values, trail)
+        assigned_name=compiled.names[assigned_variable]
+        for constr in constraints:
+            if not constr.forward_check(assigned_name, assigned_value, named_domains, prune) or not constr.propagate(named_domains, prune):
+                return False
+    return True
 
 # This function should return the domain of the given variable order based on the "least restraining value" heuristic.
 # IMPORTANT: This function should not modify any of the given arguments.
@@ -97,46 +155,51 @@ def forward_checking(problem: Problem, assigned_variable: str, assigned_value: A
 def least_restraining_values(problem: Problem, variable_to_assign: str, domains: Dict[str, set]) -> List[Any]:
     #TODO: ADD YOUR CODE HERE
 
-    pri_domain=dict()
-    retdomain=[]
-    for constr in problem.constraints:
-        if constr.__class__ is BinaryConstraint:
-            if constr.variables[0]==variable_to_assign or constr.variables[1]==variable_to_assign:
-                othervar=constr.get_other(variable_to_assign)
-                if othervar in domains.keys():
-                    s1=domains[variable_to_assign] #set of domains of variable to assign
-                    s2=domains[othervar]           #set of domains of the other variable in constraint
-                    a=dict()
-                    for i in s1:
-                        new_set=set()
-                        a[variable_to_assign]=i  
-                        #trying every value in the domain of the variable to assign with all values in the other variable domain
-                        for j in s2:
-                            a[othervar]=j
-                            bol=constr.is_satisfied(a)
-                            if bol!=0:
-                               new_set.add(j)
-                        if "domain element"+str(i) not in pri_domain.keys():
-                           pri_domain["domain element"+str(i)]=len(s2)-len(new_set)  #saving the number of changes that this value caused to the domain of the other value
-                        else:  #if this value was already available in the dictionary then add its value to the number of changes calculated lately
-                            pri_domain["domain element"+str(i)]=pri_domain["domain element"+str(i)]+len(s2)-len(new_set)
+    compiled=problem.compile()
+    return _least_restraining_values(compiled, compiled.ids[variable_to_assign], compiled.domain_list(domains))
+
+# The least restraining value ordering on the compiled problem (see "least_restraining_values").
+def _least_restraining_values(compiled: CompiledProblem, variable_to_assign: int, domains: Domains) -> List[Any]:
+    pri_domain=_restraint_counts(compiled, variable_to_assign, domains)
     # order the values according to their restrictions ascendingly, the least restricting is the first 
-    sorted_domain=sorted(pri_domain.items(),key=lambda items:items[1]) 
-    for val in sorted_domain:
-        if int(val[0][14]) not in retdomain:
-            retdomain.append(int(val[0][14]))
-    #modified after q5 
-    #check if all the values have the same restrictions, then the returned values of domain should be ordered
-    res=True
-    test_val = list(pri_domain.values())[0]
-    for ele in pri_domain:
-        if pri_domain[ele] != test_val:
-            res = False
-            break
-    if res:
-        retdomain.sort()
-    #########################
-    return retdomain
+    # and the values that have the same restrictions are ordered ascendingly
+    return sorted(pri_domain, key=lambda i:(pri_domain[i], i))
+
+# Returns the number of values that each value of the variable would remove from the domains of its unassigned neighbors.
+def _restraint_counts(compiled: CompiledProblem, variable_to_assign: int, domains: Domains) -> Dict[Any, int]:
+    s1=domains[variable_to_assign] #domain of the variable to assign
+    #pri_domain holds the number of values that each value removes from the domains of the unassigned neighbors (keyed by the value itself)
+    pri_domain={i:0 for i in s1}
+    tabulated=compiled.covers(s1)
+    for othervar, check, _, table in compiled.arcs[variable_to_assign]:
+        s2=domains[othervar]  #domain of the other variable in constraint
+        if s2 is None:
+            continue
+        if tabulated and table is not None and compiled.covers(s2):
+            #the values of the other domain that are not supported by the value (in its support table) will be removed
+            mask=s2.mask
+            for i in s1:
+                pri_domain[i]+=popcount(mask & ~table[i])
+            continue
+        for i in s1:
+            #trying every value in the domain of the variable to assign with all values in the other variable domain
+            #and counting the values that will be removed from the domain of the other variable
+            changes=0
+            for j in s2:
+                if not check(i, j):
+                    changes+=1
+            pri_domain[i]+=changes
+    #for the global constraints (such as AllDifferent), count the values that their forward checking would remove for every value
+    constraints=compiled.global_constraints[variable_to_assign]
+    if constraints:
+        named_domains=NamedDomains(compiled, domains)
+        name=compiled.names[variable_to_assign]
+        for constr in constraints:
+            for i in s1:
+                changes=[]
+                constr.forward_check(name, i, named_domains, lambda othervar, values: changes.append(len(values)))
+                pri_domain[i]+=sum(changes)
+    return pri_domain
 
 # This function should return the variable that should be picked based on the MRV heuristic.
 # IMPORTANT: This function should not modify any of the given arguments.
@@ -147,12 +210,520 @@ def least_restraining_values(problem: Problem, variable_to_assign: str, domains:
 def minimum_remaining_values(problem: Problem, domains: Dict[str, set]) -> str:
     #TODO: ADD YOUR CODE HERE
 
-    size_dic=dict()
-    for variable in domains:
-        size_dic[variable]=len(domains[variable])  #saving the lengths of all domains in the dictionary (variable: length)
-    #sort the dictionary ascendingly according to lengths and return them as list of tuples [(variable, length)]
-    sorted_size=sorted(size_dic.items(),key=lambda items:items[1]) 
-    return sorted_size[0][0]  #return the variable in the first tuple (first[0] addresses the first tuple in the list, second [0] addresses the variable in the tuple )
+    compiled=problem.compile()
+    variable=_minimum_remaining_values(compiled, compiled.domain_list(domains))
+    return None if variable is None else compiled.names[variable]
+
+# The MRV heuristic on the compiled problem (see "minimum_remaining_values"). It returns the id of the selected variable.
+def _minimum_remaining_values(compiled: CompiledProblem, domains: Domains) -> Optional[int]:
+    #loop over the variables in their order in the problem (the ids follow the order of "problem.variables" and
+    #the assigned variables have no domain so they are skipped) and keep the first variable that has the smallest domain,
+    #so ties are broken by the order of "problem.variables"
+    best_variable=None
+    best_size=0
+    for variable in range(len(compiled.variables)):
+        domain=domains[variable]
+        if domain is not None and (best_variable is None or len(domain)<best_size):
+            best_variable=variable
+            best_size=len(domain)
+    return best_variable
+
+# The propagation layer decides how the domains are reduced before and during the search.
+# A propagator is created for each call to "solve" and it is used in two places:
+#   - "preprocess" runs once before the search (after 1-Consistency) on the domains of all the variables.
+#   - "propagate" runs after every assignment during the search with the domains of the unassigned variables.
+# Both of them return False if a domain becomes empty, and record every domain reduction on the trail.
+class Propagator:
+    def preprocess(self, compiled: CompiledProblem, domains: Domains, trail: Trail) -> bool:
+        return True
+
+    def propagate(self, compiled: CompiledProblem, assigned_variable: int, assigned_value: Any, domains: Domains, trail: Trail) -> bool:
+        return _forward_checking(compiled, assigned_variable, assigned_value, domains, trail)
+
+# Forward checking only (this is the default propagation).
+class ForwardChecking(Propagator):
+    pass
+
+# An arc is a tuple (variable, other variable, check, constraint) of variable ids. Revising it removes the values of the variable
+# that have no support (no value that satisfies the constraint) in the domain of the other variable.
+Arc = Tuple[int, int, Callable[[Any, Any], bool], BinaryConstraint]
+
+# Full arc consistency using the AC-3 algorithm (a queue of arcs that are revised until nothing changes).
+# It is applied to all the arcs before the search, and during the search it maintains arc consistency (MAC):
+# after forward checking an assignment, the arcs pointing to the variables whose domains were reduced are revised.
+class AC3(Propagator):
+    def preprocess(self, compiled: CompiledProblem, domains: Domains, trail: Trail) -> bool:
+        variables = [variable for variable, domain in enumerate(domains) if domain is not None]
+        queue = [(variable, other, check, constraint) for variable in variables for other, check, constraint, _ in compiled.arcs[variable] if domains[other] is not None]
+        constraints = [constraint for variable in variables for constraint in compiled.global_constraints[variable]]
+        return self.arc_consistency(compiled, domains, queue, trail, constraints)
+
+    def propagate(self, compiled: CompiledProblem, assigned_variable: int, assigned_value: Any, domains: Domains, trail: Trail) -> bool:
+        ids = compiled.ids
+        watched = [*compiled.neighbors[assigned_variable], *(ids[variable] for constraint in compiled.global_constraints[assigned_variable] for variable in constraint.get_variables())]
+        sizes = {variable: len(domains[variable]) for variable in watched if domains[variable] is not None}
+        if not _forward_checking(compiled, assigned_variable, assigned_value, domains, trail):
+            return False
+        changed = [variable for variable, size in sizes.items() if len(domains[variable]) != size]
+        queue = [(neighbor, variable, check, constraint)
+            for variable in changed
+            for neighbor, _, constraint, _ in compiled.arcs[variable] if domains[neighbor] is not None
+            for check in (compiled.checks[(constraint, neighbor)],)]
+        constraints = [constraint for variable in changed for constraint in compiled.global_constraints[variable]]
+        return self.arc_consistency(compiled, domains, queue, trail, constraints)
+
+    # Revises the arcs in the queue until it is empty. When the domain of a variable is reduced,
+    # the arcs from its (unassigned) neighbors to it are added to the queue again.
+    # The global constraints (e.g. AllDifferent) are kept in a second queue and they are propagated whenever the arc queue is empty.
+    # When they reduce the domain of a variable, the arcs and the other global constraints that involve it are added to the queues.
+    def arc_consistency(self, compiled: CompiledProblem, domains: Domains, queue: List[Arc], trail: Trail, constraints: List[Constraint] = ()) -> bool:
+        queue = deque(dict.fromkeys(queue)) # remove the duplicate arcs while keeping the order
+        pending = set(queue)
+        constraint_queue = deque(dict.fromkeys(constraints))
+        pending_constraints = set(constraint_queue)
+        arcs, checks, tables, ids, covers = compiled.arcs, compiled.checks, compiled.tables, compiled.ids, compiled.covers
+
+        # Add the arcs and the global constraints that depend on the domain of the given variable to the queues
+        # (except for the constraint that has just reduced it).
+        def schedule(variable: int, source: Constraint) -> None:
+            for neighbor, _, neighbor_constraint, _ in arcs[variable]:
+                if neighbor_constraint is source or domains[neighbor] is None: continue
+                neighbor_arc = (neighbor, variable, checks[(neighbor_constraint, neighbor)], neighbor_constraint)
+                if neighbor_arc not in pending:
+                    pending.add(neighbor_arc)
+                    queue.append(neighbor_arc)
+            for constraint in compiled.global_constraints[variable]:
+                if constraint is not source and constraint not in pending_constraints:
+                    pending_constraints.add(constraint)
+                    constraint_queue.append(constraint)
+
+        named_domains = NamedDomains(compiled, domains)
+        changed: List[int] = []
+        def prune(variable: str, values: List[Any]) -> None:
+            index = ids[variable]
+            if _prune(domains[index], values, trail): changed.append(index)
+
+        while queue or constraint_queue:
+            if queue:
+                arc = queue.popleft()
+                pending.discard(arc)
+                variable, other, check, constraint = arc
+                table = tables.get((constraint, variable))
+                if table is not None and covers(domains[variable]) and covers(domains[other]):
+                    if not _revise_with_table(domains[variable], domains[other], table, trail):
+                        continue
+                elif not self.revise(variable, other, check, constraint, domains, trail):
+                    continue
+                if not domains[variable]:
+                    return False
+                schedule(variable, constraint)
+            else:
+                constraint = constraint_queue.popleft()
+                pending_constraints.discard(constraint)
+                changed.clear()
+                if not constraint.propagate(named_domains, prune):
+                    return False
+                for variable in changed:
+                    if not domains[variable]:
+                        return False
+                    schedule(variable, constraint)
+        return True
+
+    # Removes the values of the variable that have no support in the domain of the other variable.
+    # Returns True if the domain of the variable was reduced.
+    def revise(self, variable: int, other: int, check: Callable[[Any, Any], bool], constraint: BinaryConstraint, domains: Domains, trail: Trail) -> bool:
+        domain, other_domain = domains[variable], domains[other]
+        removed = []
+        for value in domain:
+            for other_value in other_domain:
+                if check(value, other_value): break
+            else:
+                removed.append(value)
+        return _prune(domain, removed, trail)
+
+# Revises an arc using the support table of its constraint (the domains must be covered by the table, see "CompiledProblem.covers"):
+# a value is removed if its supports do not intersect the other domain. Returns True if the domain was reduced.
+def _revise_with_table(domain: BitDomain, other_domain: BitDomain, table: SupportTable, trail: Trail) -> bool:
+    other_mask = other_domain.mask
+    removed = 0
+    for value in domain:
+        if not table[value] & other_mask: removed |= 1 << value
+    if not removed: return False
+    _prune_mask(domain, removed, trail)
+    return True
+
+# Arc consistency using the AC-2001 algorithm. It is the same as AC-3, but for every (arc, value) it remembers
+# the last support it found. When the arc is revised again, the value is kept immediately if its last support is still in the domain,
+# otherwise the search for a new support continues from the last support (the values before it were already checked).
+# The supports are changed during the search, so the old supports are recorded on the trail and restored on backtracking.
+# Note: AC-2001 requires the domain values to be ordered (e.g. integers).
+class AC2001(AC3):
+    def __init__(self) -> None:
+        super().__init__()
+        self.last_support: Dict[Tuple[BinaryConstraint, int, Any], Any] = {}
+
+    def revise(self, variable: int, other: int, check: Callable[[Any, Any], bool], constraint: BinaryConstraint, domains: Domains, trail: Trail) -> bool:
+        domain, other_domain = domains[variable], domains[other]
+        last_support = self.last_support
+        removed = []
+        old_supports = []
+        for value in domain:
+            key = (constraint, variable, value)
+            support = last_support.get(key)
+            if support is not None and support in other_domain: continue
+            for other_value in _values_after(other_domain, support):
+                if check(value, other_value):
+                    old_supports.append((key, support))
+                    last_support[key] = other_value
+                    break
+            else:
+                removed.append(value)
+        if old_supports:
+            trail.append((last_support, old_supports)) # undoing it restores the old supports using "dict.update"
+        return _prune(domain, removed, trail)
+
+# The available propagation methods that can be selected by the "propagation" option of "solve".
+PROPAGATORS: Dict[str, Callable[[], Propagator]] = {
+    "forward_checking": ForwardChecking,
+    "ac3": AC3,
+    "ac2001": AC2001,
+}
+
+# Returns the values of the domain that come after the given value in ascending order (or all the values if it is None).
+def _values_after(domain: Any, value: Any) -> Iterable[Any]:
+    if isinstance(domain, BitDomain):
+        return domain if value is None else BitDomain.from_mask(domain.mask >> (value + 1) << (value + 1))
+    values = sorted(domain)
+    return values if value is None else values[bisect_right(values, value):]
+
+# An observer of the changes to the domains during the search. The heuristics that maintain incremental data structures
+# (instead of recomputing them at every node) implement it to be notified about:
+#   - "removed" / "restored": values were removed from (or restored to) the domain of a variable (see ObservedTrail).
+#   - "assigned" / "unassigned": a variable was assigned (its domain is taken out of the domains) or unassigned (its domain is put back).
+# Since the search undoes the changes in the reverse order, an observer can ignore the changes of the assigned variables.
+class DomainObserver:
+    def removed(self, variable: int, values: Iterable[Any]) -> None:
+        pass
+
+    def restored(self, variable: int, values: Iterable[Any]) -> None:
+        pass
+
+    def assigned(self, variable: int, domain: Any) -> None:
+        pass
+
+    def unassigned(self, variable: int, domain: Any) -> None:
+        pass
+
+# A trail that notifies observers whenever a domain reduction is recorded on it (removed) or undone (restored).
+# Every domain reduction in the search goes through the trail, so this is the only place that needs to be observed.
+# The entries whose container is not one of the given domains (e.g. the supports of AC-2001) are not reported.
+class ObservedTrail(list):
+    def __init__(self, domains: Domains, observers: List[DomainObserver]) -> None:
+        super().__init__()
+        self.owners = {id(domain): variable for variable, domain in enumerate(domains) if domain is not None}
+        self.observers = observers
+
+    def append(self, entry: Tuple[Any, List[Any]]) -> None:
+        list.append(self, entry)
+        variable = self.owners.get(id(entry[0]))
+        if variable is not None:
+            for observer in self.observers:
+                observer.removed(variable, entry[1])
+
+    def pop(self) -> Tuple[Any, List[Any]]:
+        entry = list.pop(self)
+        variable = self.owners.get(id(entry[0]))
+        if variable is not None:
+            for observer in self.observers:
+                observer.restored(variable, entry[1])
+        return entry
+
+# The value ordering decides the order in which the values of the selected variable are tried.
+# Like the propagators, an ordering is created for each call to "solve" and "start" is called once before the search.
+# If "rng" is set (e.g. by the restarts of "solve"), the ties are broken randomly instead of in ascending order.
+class ValueOrdering:
+    rng: Optional[RandomGenerator] = None
+
+    def start(self, compiled: CompiledProblem, domains: Domains) -> None:
+        pass
+
+    def order(self, compiled: CompiledProblem, variable: int, domains: Domains) -> List[Any]:
+        return sorted(domains[variable])
+
+# The "least restraining value" heuristic recomputed at every node (see "least_restraining_values"). This is the default value ordering.
+class LeastRestrainingValues(ValueOrdering):
+    def order(self, compiled: CompiledProblem, variable: int, domains: Domains) -> List[Any]:
+        if self.rng is None:
+            return _least_restraining_values(compiled, variable, domains)
+        counts = _restraint_counts(compiled, variable, domains)
+        return _order_by_counts(counts, counts, self.rng)
+
+# Orders the values by their counts. The ties keep the order of the given values unless a random generator is given to shuffle them.
+def _order_by_counts(values: Iterable[Any], counts: Dict[Any, int], rng: Optional[RandomGenerator] = None) -> List[Any]:
+    if rng is None:
+        return sorted(values, key=counts.__getitem__)
+    return sorted(values, key=lambda value: (counts[value], rng.generate()))
+
+# The available value orderings that can be selected by the "value_ordering" option of "solve".
+VALUE_ORDERINGS: Dict[str, Callable[[], ValueOrdering]] = {
+    "lcv": LeastRestrainingValues,
+}
+
+# The variable ordering decides which unassigned variable is assigned next.
+# Like the value orderings, a variable ordering is created for each call to "solve" and "start" is called once before the search.
+# "select" is only called when there is at least one unassigned variable and it returns its id.
+# If "rng" is set (e.g. by the restarts of "solve"), the ties are broken randomly instead of following "problem.variables".
+class VariableOrdering:
+    rng: Optional[RandomGenerator] = None
+
+    def start(self, compiled: CompiledProblem, domains: Domains) -> None:
+        pass
+
+    def select(self, compiled: CompiledProblem, domains: Domains) -> int:
+        return _minimum_remaining_values(compiled, domains)
+
+# The MRV heuristic that scans all the domains at every node (see "minimum_remaining_values"). This is the default variable ordering.
+class MinimumRemainingValues(VariableOrdering):
+    def select(self, compiled: CompiledProblem, domains: Domains) -> int:
+        if self.rng is None:
+            return _minimum_remaining_values(compiled, domains)
+        # pick one of the variables with the smallest domain uniformly (reservoir sampling over the ties)
+        best_variable, best_size, ties = None, 0, 0
+        for variable in range(len(compiled.variables)):
+            domain = domains[variable]
+            if domain is None: continue
+            size = len(domain)
+            if best_variable is None or size < best_size:
+                best_variable, best_size, ties = variable, size, 1
+            elif size == best_size:
+                ties += 1
+                if self.rng.int(1, ties) == 1: best_variable = variable
+        return best_variable
+
+# The MRV heuristic using a bucket queue that is maintained as the domains change.
+# The unassigned variables are kept in buckets by the size of their domains, where each bucket is a bitmask of variable ids,
+# and a bitmask of the non-empty buckets is kept too. So the smallest non-empty bucket is its lowest set bit
+# and the selected variable is the lowest set bit of that bucket (the lowest id, which is the first variable in "problem.variables").
+# This gives the same variable as "minimum_remaining_values" in constant time (instead of scanning all the variables).
+# Keeping the buckets up to date costs about as much as the scan saves on 9x9 and 16x16 boards, so "mrv" stays the default.
+# If "degree" is True, the ties between the variables with the smallest domains are broken by the degree heuristic instead:
+# the variable that shares constraints with the most unassigned variables is selected (and the remaining ties follow "problem.variables").
+# This often explores fewer nodes but it does not follow the tie-breaking order required by the MRV tests.
+class BucketMinimumRemainingValues(VariableOrdering, DomainObserver):
+    def __init__(self, degree: bool = False) -> None:
+        super().__init__()
+        self.degree = degree
+
+    def start(self, compiled: CompiledProblem, domains: Domains) -> None:
+        self.domains = domains
+        self.sizes = [0 if domain is None else len(domain) for domain in domains]
+        self.buckets = [0] * (max(self.sizes, default=0) + 1)
+        self.nonempty = 0
+        self.tracked = len(compiled.variables) # only the variables in "problem.variables" are selected (like "minimum_remaining_values")
+        for variable in range(self.tracked):
+            if domains[variable] is not None: self._insert(variable, self.sizes[variable])
+        if self.degree:
+            # The variables that share a constraint with each variable and the number of unassigned ones among them
+            ids = compiled.ids
+            self.adjacent = [[other for other in dict.fromkeys([*compiled.neighbors[variable], 
+                *(ids[name] for constraint in compiled.global_constraints[variable] for name in constraint.get_variables())]) if other != variable]
+                for variable in range(len(domains))]
+            self.unassigned_degree = [sum(domains[other] is not None for other in adjacent) for adjacent in self.adjacent]
+
+    def _insert(self, variable: int, size: int) -> None:
+        self.buckets[size] |= 1 << variable
+        self.nonempty |= 1 << size
+
+    def _delete(self, variable: int, size: int) -> None:
+        bucket = self.buckets[size] = self.buckets[size] & ~(1 << variable)
+        if not bucket: self.nonempty &= ~(1 << size)
+
+    def _resize(self, variable: int, change: int) -> None:
+        if variable >= self.tracked or self.domains[variable] is None: return
+        buckets, size, bit = self.buckets, self.sizes[variable], 1 << variable
+        bucket = buckets[size] = buckets[size] ^ bit
+        if not bucket: self.nonempty ^= 1 << size
+        size = self.sizes[variable] = size + change
+        buckets[size] |= bit
+        self.nonempty |= 1 << size
+
+    def removed(self, variable: int, values: Iterable[Any]) -> None:
+        self._resize(variable, -len(values))
+
+    def restored(self, variable: int, values: Iterable[Any]) -> None:
+        self._resize(variable, len(values))
+
+    def assigned(self, variable: int, domain: Any) -> None:
+        self._delete(variable, self.sizes[variable])
+        if self.degree:
+            for other in self.adjacent[variable]: self.unassigned_degree[other] -= 1
+
+    def unassigned(self, variable: int, domain: Any) -> None:
+        self._insert(variable, self.sizes[variable])
+        if self.degree:
+            for other in self.adjacent[variable]: self.unassigned_degree[other] += 1
+
+    def select(self, compiled: CompiledProblem, domains: Domains) -> int:
+        nonempty = self.nonempty
+        bucket = self.buckets[(nonempty & -nonempty).bit_length() - 1]
+        if bucket & (bucket - 1) and self.degree: # keep the variables with the highest degree among the ties
+            best, best_degree, rest = 0, -1, bucket
+            while rest:
+                lowest = rest & -rest
+                degree = self.unassigned_degree[lowest.bit_length() - 1]
+                if degree > best_degree: best, best_degree = lowest, degree
+                elif degree == best_degree: best |= lowest
+                rest ^= lowest
+            bucket = best
+        if bucket & (bucket - 1) and self.rng is not None: # drop a random number of the lowest ties
+            for _ in range(self.rng.int(0, popcount(bucket) - 1)):
+                bucket &= bucket - 1
+        return (bucket & -bucket).bit_length() - 1
+
+# The available variable orderings that can be selected by the "variable_ordering" option of "solve".
+VARIABLE_ORDERINGS: Dict[str, Callable[[], VariableOrdering]] = {
+    "mrv": MinimumRemainingValues,
+    "mrv_bucket": BucketMinimumRemainingValues,
+    "mrv_degree": lambda: BucketMinimumRemainingValues(degree=True),
+}
+
+# The statistics of a call to "solve" (pass an instance to its "stats" argument or use "return_stats" to get them).
+# The times are measured only when the statistics are requested, so they cost nothing otherwise.
+@dataclass
+class SearchStats:
+    nodes: int = 0                  # The number of explored nodes (this is the number of calls to "problem.is_complete")
+    restarts: int = 0               # The number of times the search was restarted (see the "restarts" option of "solve")
+    backtracks: int = 0             # The number of values that were tried and failed (their propagation failed or their subtree has no solution)
+    max_depth: int = 0              # The largest number of assigned variables at a node
+    propagations: int = 0           # The number of propagations after an assignment (e.g. forward checking calls)
+    pruned: int = 0                 # The number of values removed from the domains by these propagations
+    wipeouts: int = 0               # The number of propagations that emptied a domain
+    selection_time: float = 0.0     # The time (in seconds) spent selecting the variables (e.g. MRV)
+    ordering_time: float = 0.0      # The time spent ordering the values (e.g. LCV)
+    propagation_time: float = 0.0   # The time spent in the propagations
+
+# The interface of the hooks that can be given to "solve" to observe the search (e.g. by a profiler) without changing the solver.
+# All the methods do nothing, so a hook only overrides the events that it needs.
+class SearchHook:
+    # Called when the search enters a node with its (partial) assignment
+    def node(self, assignment: Assignment) -> None:
+        pass
+
+    # Called when the value of a variable failed (before the next value is tried)
+    def backtrack(self, variable: str, value: Any) -> None:
+        pass
+
+    # Called when a complete assignment is found
+    def solution(self, assignment: Assignment) -> None:
+        pass
+
+# This exception stops a search run when it reaches its node limit (so that it can be restarted).
+class NodeLimitReached(Exception):
+    pass
+
+# Returns the i-th element (starting from 1) of the Luby sequence: 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ...
+def luby(index: int) -> int:
+    while True:
+        k = (index + 1).bit_length() - 1
+        if (1 << k) - 1 == index: return 1 << (k - 1)
+        index -= (1 << k) - 1
+
+# The available restart strategies that can be selected by the "restarts" option of "solve".
+# Each one returns the node limit of the i-th run (starting from 1) as a multiple of "restart_base" given the "restart_factor".
+RESTART_STRATEGIES: Dict[str, Callable[[int, float], float]] = {
+    "luby": lambda run, factor: luby(run),
+    "geometric": lambda run, factor: factor ** (run - 1),
+}
+
+# The state of a backtracking search that is shared by all its nodes.
+@dataclass
+class Search:
+    problem: Problem
+    compiled: CompiledProblem
+    domains: Domains                    # The domains of the unassigned variables (indexed by variable ids)
+    trail: Trail
+    propagator: Propagator
+    variable_ordering: VariableOrdering
+    value_ordering: ValueOrdering
+    observers: List[DomainObserver]     # The heuristics that are notified about the changes to the domains
+    stats: SearchStats
+    node_limit: float = math.inf        # The search stops (raising NodeLimitReached) when "stats.nodes" reaches this limit
+    backjumping: Optional['Backjumping'] = None
+    hooks: Sequence[SearchHook] = ()
+
+# Counts a new node of the search, stops the search if it reached its node limit and notifies the hooks.
+def _visit(assig: Assignment, search: Search) -> None:
+    stats=search.stats
+    if stats.nodes>=search.node_limit:
+        raise NodeLimitReached()
+    stats.nodes+=1
+    if len(assig)>stats.max_depth:
+        stats.max_depth=len(assig)
+    for hook in search.hooks:
+        hook.node(assig)
+
+# Replaces the heuristics and the propagation of a search by wrappers that measure them in its statistics.
+def _profile(search: Search) -> None:
+    stats=search.stats
+    select,order,propagate=search.variable_ordering.select,search.value_ordering.order,search.propagator.propagate
+    #only the trail entries of the variable domains are pruned values (e.g. AC-2001 also trails its support pointers), like "ObservedTrail"
+    owners={id(domain) for domain in search.domains if domain is not None}
+    def timed_select(compiled: CompiledProblem, domains: Domains) -> int:
+        start=time.perf_counter()
+        variable=select(compiled,domains)
+        stats.selection_time+=time.perf_counter()-start
+        return variable
+    def timed_order(compiled: CompiledProblem, variable: int, domains: Domains) -> List[Any]:
+        start=time.perf_counter()
+        values=order(compiled,variable,domains)
+        stats.ordering_time+=time.perf_counter()-start
+        return values
+    def timed_propagate(compiled: CompiledProblem, assigned_variable: int, assigned_value: Any, domains: Domains, trail: Trail) -> bool:
+        mark=len(trail)
+        start=time.perf_counter()
+        consistent=propagate(compiled,assigned_variable,assigned_value,domains,trail)
+        stats.propagation_time+=time.perf_counter()-start
+        stats.propagations+=1
+        stats.pruned+=sum(len(removed) for container,removed in trail[mark:] if id(container) in owners)
+        if not consistent: stats.wipeouts+=1
+        return consistent
+    search.variable_ordering.select=timed_select
+    search.value_ordering.order=timed_order
+    search.propagator.propagate=timed_propagate
+
+# A bounded store of learned nogoods. A nogood is a set of (variable, value) pairs that can not all be part of a solution.
+# Each nogood is indexed under all its pairs, so "violated" finds it when the last of its variables is assigned (whatever the order).
+# When the store is full, the oldest nogood is forgotten. The nogoods larger than "max_size" are not stored (they are rarely violated again).
+class NogoodStore:
+    def __init__(self, capacity: int, max_size: int = 20) -> None:
+        self.capacity = capacity
+        self.max_size = max_size
+        self.nogoods: Deque[Tuple[Tuple[int, Any], ...]] = deque()
+        self.index: Dict[Tuple[int, Any], List[Tuple[Tuple[int, Any], ...]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.nogoods)
+
+    def add(self, nogood: Iterable[Tuple[int, Any]]) -> None:
+        nogood = tuple(nogood)
+        if not nogood or len(nogood) > self.max_size: return
+        if len(self.nogoods) >= self.capacity:
+            # the oldest nogood is the first one in the index of each of its pairs
+            for pair in self.nogoods.popleft():
+                nogoods = self.index[pair]
+                nogoods.pop(0)
+                if not nogoods: del self.index[pair]
+        self.nogoods.append(nogood)
+        for pair in nogood:
+            self.index.setdefault(pair, []).append(nogood)
+
+    # Returns the other variables of a nogood that is violated by assigning the value to the variable
+    # (given the values of the assigned variables indexed by id, None for the unassigned ones), or None if no nogood is violated.
+    def violated(self, variable: int, value: Any, values: List[Any]) -> Optional[List[int]]:
+        for nogood in self.index.get((variable, value), ()):
+            if all(other == variable or values[other] == other_value for other, other_value in nogood):
+                return [other for other, _ in nogood if other != variable]
+        return None
 
 # This function should solve CSP problems using backtracking search with forward checking.
 # The variable ordering should be decided by the MRV heuristic.
@@ -163,44 +734,299 @@ def minimum_remaining_values(problem: Problem, domains: Dict[str, set]) -> str:
 # IMPORTANT: To get the correct result for the explored nodes, you should check if the assignment is complete only once using "problem.is_complete"
 #            for every assignment including the initial empty assignment, EXCEPT for the assignments pruned by the forward checking.
 #            Also, if 1-Consistency deems the whole problem unsolvable, you shouldn't call "problem.is_complete" at all.
-def solve(problem: Problem) -> Optional[Assignment]:
+# The "propagation" option selects how the domains are reduced (see PROPAGATORS):
+#   - "forward_checking" (default): forward checking after every assignment.
+#   - "ac3" or "ac2001": full arc consistency before the search and maintaining arc consistency (MAC) after every assignment.
+#   If the arc consistency preprocessing deems the problem unsolvable, "problem.is_complete" is not called at all (like 1-Consistency).
+# The "value_ordering" option selects how the values are ordered (see VALUE_ORDERINGS):
+#   - "lcv" (default): the "least restraining value" heuristic recomputed at every node.
+# The "variable_ordering" option selects how the next variable is selected (see VARIABLE_ORDERINGS):
+#   - "mrv" (default): the MRV heuristic computed by scanning the domains at every node.
+#   - "mrv_bucket": the same variable selected from a bucket queue of the domain sizes.
+#   - "mrv_degree": the bucket queue with the degree heuristic as a tie-breaker (this changes the explored nodes).
+# If "backjumping" is True, the search uses conflict-directed backjumping (see "backjump") instead of chronological backtracking.
+# It is only supported with forward checking and binary constraints. It finds the same first solution but it may explore fewer nodes.
+# If "nogoods" is positive, the backjumping search also learns up to this number of nogoods (see NogoodStore).
+# If "restarts" is "luby" or "geometric", the search is restarted whenever a run explores more nodes than its limit
+# (see RESTART_STRATEGIES) which grows with every run, and the ties of the heuristics are broken randomly using a RandomGenerator seeded with "seed".
+# So every run explores a different tree and the worst-case runtimes of hard problems are less likely. Since the limits grow without bound,
+# the search is still complete (it can prove that a problem is unsolvable). The learned nogoods are kept across the restarts.
+# If "stats" is given, it is filled with the statistics of the search (see SearchStats).
+# If "return_stats" is True, a tuple of the result and the statistics is returned instead of the result only.
+# The "hooks" are notified about the events of the search (see SearchHook).
+def solve(problem: Problem, propagation: str = "forward_checking", value_ordering: str = "lcv", variable_ordering: str = "mrv",
+          backjumping: bool = False, nogoods: int = 0, restarts: Optional[str] = None, restart_base: int = 100, restart_factor: float = 1.5,
+          seed: int = 0, stats: Optional[SearchStats] = None, return_stats: bool = False, hooks: Sequence[SearchHook] = ()) -> Optional[Assignment]:
     #TODO: ADD YOUR CODE HERE
     
+    _check_options(propagation,value_ordering,variable_ordering)
+    if restarts is not None and restarts not in RESTART_STRATEGIES:
+        raise ValueError(f"Unknown restart strategy {restarts!r}, expected one of {sorted(RESTART_STRATEGIES)}")
+    if nogoods and not backjumping:
+        raise ValueError("Learning nogoods requires backjumping")
+    if backjumping and (propagation!="forward_checking" or not all(isinstance(constraint,(UnaryConstraint,BinaryConstraint)) for constraint in problem.constraints)):
+        raise ValueError("Backjumping is only supported with forward checking and binary constraints")
+    profile=stats is not None or return_stats
+    stats=SearchStats() if stats is None else stats
+    res=None  #if one domain or more becomes empty after the one_consistency function then the result is None
     #adjust all domains of variables that have one consistency and remove the unary constraints from the problem
     unary_bol=one_consistency(problem) 
     if unary_bol==True:  #if no domains became empty, start backtracking
-        a=dict() #start backtracking with an empty assignemnt
-        res=backtrack(a,problem,problem.domains)
-        return res
+        #search over the compiled problem where the variables are integer ids and the domains are a list indexed by them
+        compiled=problem.compile()
+        nogood_store=NogoodStore(nogoods) if nogoods else None
+        run=lambda node_limit,rng: _search(problem,compiled,propagation,value_ordering,variable_ordering,backjumping,nogood_store,stats,node_limit,rng,hooks,profile)
+        if restarts is None:
+            res=run(math.inf,None)
+        else:
+            rng=RandomGenerator(seed)
+            for index in itertools.count(1):
+                try:
+                    res=run(stats.nodes+max(1,round(restart_base*RESTART_STRATEGIES[restarts](index,restart_factor))),rng)
+                    break
+                except NodeLimitReached:
+                    stats.restarts+=1
+    return (res,stats) if return_stats else res
+
+# Raises a ValueError if one of the heuristics is not registered
+def _check_options(propagation: str, value_ordering: str, variable_ordering: str) -> None:
+    for name,options in ((propagation,PROPAGATORS),(value_ordering,VALUE_ORDERINGS),(variable_ordering,VARIABLE_ORDERINGS)):
+        if name not in options:
+            raise ValueError(f"Unknown option {name!r}, expected one of {sorted(options)}")
+
+# Runs one backtracking search (see "solve") with new heuristics and a new copy of the domains.
+def _search(problem: Problem, compiled: CompiledProblem, propagation: str, value_ordering: str, variable_ordering: str, backjumping: bool,
+            nogood_store: Optional[NogoodStore], stats: SearchStats, node_limit: float, rng: Optional[RandomGenerator],
+            hooks: Sequence[SearchHook] = (), profile: bool = False) -> Optional[Assignment]:
+    search=_start_search(problem,compiled,propagation,value_ordering,variable_ordering,backjumping,nogood_store,stats,node_limit,rng,hooks,profile)
+    if search is None:
+        return None
+    a=dict() #start backtracking with an empty assignemnt
+    if backjumping:
+        res,_=backjump(a,search,search.backjumping)
     else:
-        return None  #if one domain or more became empty after the one_consistency function then return None
-    
-def backtrack(assig:Assignment,problem:Problem,domains: Dict[str, set]) ->Optional[Assignment]:
+        res=backtrack(a,search)
+    return res
+
+# Creates the state of a search (the heuristics and a new copy of the domains) and runs the preprocessing of the propagator.
+# Returns None if the preprocessing proves that the problem has no solution. If "profile" is True, the search is measured (see "_profile").
+def _start_search(problem: Problem, compiled: CompiledProblem, propagation: str, value_ordering: str, variable_ordering: str, backjumping: bool = False,
+                  nogood_store: Optional[NogoodStore] = None, stats: Optional[SearchStats] = None, node_limit: float = math.inf,
+                  rng: Optional[RandomGenerator] = None, hooks: Sequence[SearchHook] = (), profile: bool = False) -> Optional[Search]:
+    propagator=PROPAGATORS[propagation]()
+    ordering=VALUE_ORDERINGS[value_ordering]()
+    selector=VARIABLE_ORDERINGS[variable_ordering]()
+    ordering.rng=selector.rng=rng
+    #the domains are copied and small integer domains are stored as BitDomains
+    domains=compiled.domain_list(to_bit_domains(problem.domains))
+    ordering.start(compiled,domains)
+    selector.start(compiled,domains)
+    #the heuristics that maintain incremental data structures observe the domain reductions through the trail
+    observers=[heuristic for heuristic in (selector,ordering) if isinstance(heuristic,DomainObserver)]
+    cbj=None
+    if backjumping:
+        #the backjumping bookkeeping needs to know which variables are pruned by each assignment
+        cbj=Backjumping(domains,nogood_store)
+        observers.append(cbj)
+    trail=ObservedTrail(domains,observers) if observers else []
+    if not propagator.preprocess(compiled,domains,trail):
+        return None
+    stats=SearchStats() if stats is None else stats
+    search=Search(problem,compiled,domains,trail,propagator,selector,ordering,observers,stats,node_limit,cbj,hooks)
+    if profile:
+        _profile(search)
+    return search
+
+# Lazily yields every solution of the problem (as a new dictionary) in the order in which the search finds them.
+# The search is suspended between the solutions, so taking the first few solutions only explores the tree up to the last one.
+# It uses the same propagation and heuristics as "solve" (backjumping and restarts are not supported since they skip parts of the tree).
+# Like "solve", it applies "one_consistency" to the problem. If "limit" is given, at most "limit" solutions are yielded.
+def iter_solutions(problem: Problem, limit: Optional[int] = None, propagation: str = "forward_checking", value_ordering: str = "lcv",
+                   variable_ordering: str = "mrv", stats: Optional[SearchStats] = None) -> Iterator[Assignment]:
+    for assignment in _iter_assignments(problem, limit, propagation, value_ordering, variable_ordering, stats):
+        yield dict(assignment)
+
+# Returns the number of solutions of the problem (up to "limit", e.g. a limit of 2 is enough to check that a solution is unique).
+# The solutions are counted without copying them (see "iter_solutions").
+def count_solutions(problem: Problem, limit: Optional[int] = None, propagation: str = "forward_checking", value_ordering: str = "lcv",
+                    variable_ordering: str = "mrv", stats: Optional[SearchStats] = None) -> int:
+    return sum(1 for _ in _iter_assignments(problem, limit, propagation, value_ordering, variable_ordering, stats))
+
+# Yields the solutions of the problem, the yielded assignment is the one used by the search so it is only valid until the next solution.
+def _iter_assignments(problem: Problem, limit: Optional[int], propagation: str, value_ordering: str, variable_ordering: str,
+                      stats: Optional[SearchStats]) -> Iterator[Assignment]:
+    _check_options(propagation,value_ordering,variable_ordering)
+    if limit is not None and limit <= 0 or not one_consistency(problem):
+        return
+    search=_start_search(problem,problem.compile(),propagation,value_ordering,variable_ordering,stats=stats,profile=stats is not None)
+    if search is None:
+        return
+    solutions=backtrack_all(dict(),search)
+    yield from solutions if limit is None else itertools.islice(solutions,limit)
+
+# The assignment is kept as a dictionary of variable names (it is what "problem.is_complete" checks and what "solve" returns),
+# while the variables, domains and heuristics inside the search use the integer ids of the compiled problem.
+def backtrack(assig:Assignment,search:Search) ->Optional[Assignment]:
+    problem,compiled,domains,trail=search.problem,search.compiled,search.domains,search.trail
+    _visit(assig,search)
     if problem.is_complete(assig) : #if the assignment is complete then return the assignment
+        for hook in search.hooks:
+            hook.solution(assig)
         return assig
-    var=minimum_remaining_values(problem,domains) #get the MRV variable 
-    if len(domains[var])==1 :  #if the variable has one value in the domain only then save this value in values set 
-       values=domains[var]
+    var=search.variable_ordering.select(compiled,domains) #get the MRV variable 
+    if len(domains[var])==1 :  #if the variable has one value in the domain only then save this value in values list
+       values=list(domains[var])
     else:
         #if the variable has many values then get the least restraining values 
-       values=least_restraining_values(problem,var,domains) 
-    dummy_domains=copy.deepcopy(domains)  #deeply copy the initial domains before changes 
-    del domains[var] #remove the domain of the variable to be assigned from the domains
+       values=search.value_ordering.order(compiled,var,domains) 
+    name=compiled.names[var]
+    domain=domains[var] #remove the domain of the variable to be assigned from the domains (it is put back before returning)
+    domains[var]=None
+    for observer in search.observers:
+        observer.assigned(var,domain)
     for val in values:
-        assig[var]=val #assigning value to the variable
-        forw_bol=forward_checking(problem,var,val,domains)  #forward checking this assignment
+        mark=len(trail) #remember where the reductions done by this assignment start on the trail
+        assig[name]=val #assigning value to the variable
+        forw_bol=search.propagator.propagate(compiled,var,val,domains,trail)  #forward checking (or maintaining arc consistency for) this assignment
         #if the returned value of the forward checking is true then keep moving in the backtrack function
         #and assign new variable with new value as long as the forward checking is true 
         #if the forward checking is false then try assigning another value to the same variable (looping over values)
         if forw_bol==True:  
-            result=backtrack(assig,problem,domains)
+            result=backtrack(assig,search)
             if result!=None: #if the returned value from the backtrack is an assignemnt not None then return it
                 return result
-            #if the returned value from the backtrack is None that means that the forward_checking failed 
-            # at a certain variable, so we need to return back to the domain that we deeply copied before changes 
-            domains=dummy_domains #so return the domains to its initial copy before changes and if the variable to be assigned is in thsi domain remove it 
-            if var in domains.keys():
-                del domains[var]
-    return None  #if all values failed in the forwrad checking then return None
+        #the assignment failed, so undo the reductions that it made to the domains (including the ones done deeper in the search)
+        undo_trail(trail,mark)
+        search.stats.backtracks+=1
+        for hook in search.hooks:
+            hook.backtrack(name,val)
+    #all values failed, so unassign the variable and give it back its domain before returning None
+    del assig[name]
+    domains[var]=domain
+    for observer in search.observers:
+        observer.unassigned(var,domain)
+    return None
 
+# The same search as "backtrack" except that it yields every complete assignment and then continues the search (see "iter_solutions").
+# The state of the search is restored after each solution, so the generator can be abandoned at any point.
+def backtrack_all(assig:Assignment,search:Search) ->Iterator[Assignment]:
+    problem,compiled,domains,trail=search.problem,search.compiled,search.domains,search.trail
+    _visit(assig,search)
+    if problem.is_complete(assig) :
+        for hook in search.hooks:
+            hook.solution(assig)
+        yield assig
+        return
+    var=search.variable_ordering.select(compiled,domains)
+    if len(domains[var])==1 :
+       values=list(domains[var])
+    else:
+       values=search.value_ordering.order(compiled,var,domains) 
+    name=compiled.names[var]
+    domain=domains[var]
+    domains[var]=None
+    for observer in search.observers:
+        observer.assigned(var,domain)
+    for val in values:
+        mark=len(trail)
+        assig[name]=val
+        if search.propagator.propagate(compiled,var,val,domains,trail):
+            yield from backtrack_all(assig,search)
+        undo_trail(trail,mark)
+        search.stats.backtracks+=1
+        for hook in search.hooks:
+            hook.backtrack(name,val)
+    del assig[name]
+    domains[var]=domain
+    for observer in search.observers:
+        observer.unassigned(var,domain)
 
+# The bookkeeping of conflict-directed backjumping (see "backjump").
+# For every variable, "pruned_by[x]" is the stack of the assigned variables whose forward checking removed values from the domain of x.
+# It observes the trail to collect the variables pruned by the current assignment ("touched").
+class Backjumping(DomainObserver):
+    def __init__(self, domains: Domains, nogoods: Optional[NogoodStore] = None) -> None:
+        self.pruned_by: List[List[int]] = [[] for _ in domains]
+        self.values: List[Any] = [None] * len(domains)   # The values of the assigned variables
+        self.stack: List[int] = []                        # The assigned variables in the order of their assignment
+        self.touched: Optional[List[int]] = None
+        self.nogoods = nogoods
+
+    def removed(self, variable: int, values: Iterable[Any]) -> None:
+        if self.touched is not None: self.touched.append(variable)
+
+# Backtracking search with conflict-directed backjumping on top of forward checking (FC-CBJ, Prosser 1993).
+# It returns the solution (or None) and the conflict set of the failure: the assigned variables that caused it.
+#   - If forward checking an assignment wipes out the domain of a variable, the assignment failed because of the variables that pruned that domain.
+#   - If a subtree fails, and the selected variable is not in its conflict set, changing the value of this variable can not fix the failure,
+#     so the remaining values are skipped and the conflict set is returned to the parent (the search jumps back to the deepest culprit).
+#   - If all the values fail, the conflict set is the union of their conflict sets and the variables that pruned the selected variable's domain.
+#     In this case the values of the variables in the conflict set form a nogood that can be learned (see NogoodStore).
+# The explored nodes are counted exactly like "backtrack" (the nogoods prune assignments like forward checking).
+def backjump(assig:Assignment,search:Search,cbj:Backjumping) ->Tuple[Optional[Assignment],Set[int]]:
+    problem,compiled,domains,trail=search.problem,search.compiled,search.domains,search.trail
+    _visit(assig,search)
+    if problem.is_complete(assig):
+        for hook in search.hooks:
+            hook.solution(assig)
+        return assig,set()
+    var=search.variable_ordering.select(compiled,domains)
+    if len(domains[var])==1:
+        values=list(domains[var])
+    else:
+        values=search.value_ordering.order(compiled,var,domains)
+    name=compiled.names[var]
+    domain=domains[var]
+    domains[var]=None
+    for observer in search.observers:
+        observer.assigned(var,domain)
+    cbj.stack.append(var)
+    conflict=set(cbj.pruned_by[var]) #the past variables that removed values from the domain of this variable
+    jumped=False
+    for val in values:
+        if cbj.nogoods is not None:
+            reason=cbj.nogoods.violated(var,val,cbj.values)
+            if reason is not None: #a learned nogood rules out this value
+                conflict.update(reason)
+                continue
+        mark=len(trail)
+        assig[name]=val
+        cbj.values[var]=val
+        touched=cbj.touched=[]
+        ok=search.propagator.propagate(compiled,var,val,domains,trail)
+        cbj.touched=None
+        touched=list(dict.fromkeys(touched))
+        if ok:
+            for other in touched:
+                cbj.pruned_by[other].append(var)
+            result,child_conflict=backjump(assig,search,cbj)
+            if result is not None:
+                return result,set()
+            for other in touched:
+                cbj.pruned_by[other].pop()
+            undo_trail(trail,mark)
+            search.stats.backtracks+=1
+            for hook in search.hooks:
+                hook.backtrack(name,val)
+            if var not in child_conflict: #this variable is not responsible for the failure, so jump back over it
+                conflict,jumped=child_conflict,True
+                break
+            child_conflict.discard(var)
+            conflict.update(child_conflict)
+        else:
+            #the domain of a variable was wiped out: its other values were removed by the variables that pruned it
+            wiped=next((other for other in reversed(touched) if domains[other] is not None and not domains[other]),None)
+            conflict.update(cbj.pruned_by[wiped] if wiped is not None else cbj.stack[:-1])
+            undo_trail(trail,mark)
+            search.stats.backtracks+=1
+            for hook in search.hooks:
+                hook.backtrack(name,val)
+    assig.pop(name,None) #the variable may not have been assigned if all its values were ruled out by nogoods
+    cbj.values[var]=None
+    cbj.stack.pop()
+    domains[var]=domain
+    for observer in search.observers:
+        observer.unassigned(var,domain)
+    if not jumped and cbj.nogoods is not None:
+        cbj.nogoods.add((other,cbj.values[other]) for other in sorted(conflict))
+    return None,conflict
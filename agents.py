@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Generic
+from typing import Callable, Generic, Optional
 from game import HeuristicFunction, Game, S, A
 from helpers.mt19937 import RandomGenerator
+import itertools, time
 
 # This is an abstract class for all agents
 class Agent(ABC, Generic[S, A]):
@@ -22,20 +23,75 @@ class HumanAgent(Agent[S, A]):
     def act(self, game: Game[S, A], state: S) -> A:
         return self.user_input_fn(game, state)
 
+# This exception stops a search once its time budget is over
+class SearchTimeout(Exception):
+    pass
+
 # The search agent requests the action from a search algorithm
+# If "time_per_move" (in milliseconds) is given, the agent uses iterative deepening: it searches to depth 1, 2, 3, ...
+# (up to "search_depth" if it is not -1) and returns the action of the deepest search that finished before the time is over.
+# So it returns the same action as a search to the completed depth (including its tie-breaks). The search functions that keep a
+# transposition table (e.g. alphabeta_with_history_ordering) try the best move of the previous iteration first, so they prune more.
 class SearchAgent(Agent[S, A]):
     def __init__(self,
         search_fn: Callable[[Game[S, A], S, HeuristicFunction, int], A],
         heuristic: HeuristicFunction = (lambda *_: 0), 
-        search_depth: int = -1) -> None:
+        search_depth: int = -1,
+        time_per_move: Optional[float] = None) -> None:
         super().__init__()
+        if time_per_move is not None and search_depth == 0:
+            raise ValueError("Iterative deepening needs a search depth of at least 1 (or -1 for no limit)")
         self.search_fn = search_fn
         self.heuristic = heuristic
         self.search_depth = search_depth
+        self.time_per_move = time_per_move
+        self.completed_depth = None # The depth of the last search used by "act"
     
     def act(self, game: Game[S, A], state: S) -> A:
-        _, action = self.search_fn(game, state, self.heuristic, self.search_depth)
-        return action
+        if self.time_per_move is None:
+            _, action = self.search_fn(game, state, self.heuristic, self.search_depth)
+            self.completed_depth = self.search_depth
+            return action
+        return self.iterative_deepening(game, state)
+
+    # Run deeper and deeper searches until the time is over and return the action of the deepest one that finished.
+    # The searches are stopped from inside "game.is_terminal" (which is called once per node), so the search functions do not need to change.
+    # The root actions are not reordered: trying the previous best action first would change which action wins the ties.
+    # The first iteration always finishes (even if it is over the budget) so that there is always an action to return.
+    # The deepening also stops once a search does not reach its depth limit (it explored the whole game tree, so a deeper one is the same).
+    def iterative_deepening(self, game: Game[S, A], state: S) -> A:
+        deadline = time.perf_counter() + self.time_per_move / 1000
+        is_terminal = game.is_terminal
+        best_action, timed = None, False
+        cutoff = False # whether the current iteration reached its depth limit (it called the heuristic)
+
+        def timed_is_terminal(node):
+            if timed and time.perf_counter() >= deadline:
+                raise SearchTimeout()
+            return is_terminal(node)
+
+        def tracked_heuristic(game, node, agent):
+            nonlocal cutoff
+            cutoff = True
+            return self.heuristic(game, node, agent)
+
+        wrapped = vars(game).get("is_terminal")
+        game.is_terminal = timed_is_terminal
+        try:
+            depths = range(1, self.search_depth + 1) if self.search_depth > 0 else itertools.count(1)
+            for depth in depths:
+                cutoff = False
+                try:
+                    _, action = self.search_fn(game, state, tracked_heuristic, depth)
+                except SearchTimeout:
+                    break
+                best_action, self.completed_depth, timed = action, depth, True
+                if not cutoff or time.perf_counter() >= deadline: break
+        finally:
+            # remove the wrapper (and restore the function that was already set on the game, if any)
+            del game.is_terminal
+            if wrapped is not None: game.is_terminal = wrapped
+        return best_action
 
 # The random agent selects actions randomly
 class RandomAgent(Agent[S, A]):
@@ -0,0 +1,189 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from collections import deque
+from dataclasses import asdict
+from sudoku import SudokuProblem, is_compact_line
+from problem_cache import ProblemCache
+from CSP_solver import PROPAGATORS, RESTART_STRATEGIES, SearchStats, iter_solutions, solve
+import argparse, json, os, sys, time
+
+# A puzzle to solve in the batch: its id and the text of the puzzle (in the format accepted by SudokuProblem.from_text)
+Puzzle = Tuple[str, str]
+
+# This exception is raised inside a worker when a puzzle exceeds its time budget
+class PuzzleTimeout(Exception):
+    pass
+
+# Read the puzzles from a path
+# If the path is a directory, every ".txt" file in it is a puzzle and its id is the file name.
+# Otherwise, the file may contain many puzzles separated by empty lines and the id of each is "path:index".
+# A file in the compact format (one puzzle per line) is also accepted and the id of each puzzle is "path:line_number".
+# Lines starting with '#' are comments.
+def read_puzzles(path: str) -> Iterator[Puzzle]:
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if not name.endswith(".txt"): continue
+            with open(os.path.join(path, name), 'r') as f:
+                yield name, f.read()
+        return
+    with open(path, 'r') as f:
+        index, lines = 0, []
+        for line_number, line in enumerate(f, 1):
+            if line.startswith('#'):
+                continue
+            if not lines and is_compact_line(line.strip()):
+                yield f"{path}:{line_number}", line.strip()
+            elif line.strip():
+                lines.append(line)
+            elif lines:
+                yield f"{path}:{index}", ''.join(lines)
+                index, lines = index + 1, []
+        if lines:
+            yield f"{path}:{index}", ''.join(lines)
+
+# Solve a single puzzle and return its record
+# The number of explored nodes is the number of "is_complete" calls (the same measure used by the autograder).
+# The record also holds the statistics of the search (see SearchStats).
+# The timeout is checked at every node (of either backend), so it works in any process without signals or helper threads.
+# If "compact" is True, the solution is written as a single line (see "SudokuProblem.format_line") instead of a list of rows.
+# The "backend" option selects the CSP solver ("csp") or the exact cover solver ("dlx", its nodes are the rows it selected).
+# If the "max_solutions" option is more than 1, the solutions are enumerated (up to this number) and their number is added to the record,
+# e.g. 2 is enough to check that every puzzle of a corpus has a unique solution.
+def solve_puzzle(puzzle: Puzzle, timeout: Optional[float] = None, options: Dict[str, Any] = {}, compact: bool = False) -> Dict[str, Any]:
+    puzzle_id, text = puzzle
+    start = time.perf_counter()
+    deadline = None if timeout is None else start + timeout
+    record = {"id": puzzle_id, "solution": None, "nodes": 0}
+    stats = SearchStats()
+    try:
+        cache = options.get("cache")
+        problem = SudokuProblem.from_text(text, **options.get("load", {}), cache=cache and ProblemCache(cache))
+        def count_node():
+            record["nodes"] += 1
+            if deadline is not None and time.perf_counter() > deadline:
+                raise PuzzleTimeout()
+        is_complete = problem.is_complete
+        def counted_is_complete(assignment):
+            count_node()
+            return is_complete(assignment)
+        problem.is_complete = counted_is_complete
+        max_solutions = options.get("max_solutions", 1)
+        if options.get("backend", "csp") == "dlx":
+            cover = problem.exact_cover()
+            solutions = [dict(solution) for solution in cover.solutions(max_solutions, count_node)]
+            stats.nodes = record["nodes"]
+        elif max_solutions > 1:
+            propagation = options.get("solve", {}).get("propagation", "forward_checking")
+            solutions = list(iter_solutions(problem, max_solutions, propagation, stats=stats))
+        else:
+            solutions = [result for result in (solve(problem, **options.get("solve", {}), stats=stats),) if result is not None]
+        if max_solutions > 1:
+            record["solutions"] = len(solutions)
+        result = solutions[0] if solutions else None
+        if result is None:
+            record["status"] = "unsatisfiable"
+        else:
+            if compact:
+                record["solution"] = problem.format_line(result)
+            else:
+                values = {**problem.clues, **result}
+                record["solution"] = [[values[str((r, c))] for c in range(problem.size)] for r in range(problem.size)]
+            record["status"] = "solved"
+    except PuzzleTimeout:
+        record["status"] = "timeout"
+    except Exception as err:
+        record["status"] = "error"
+        record["error"] = f"{type(err).__name__}: {err}"
+    record["stats"] = asdict(stats)
+    record["time"] = time.perf_counter() - start
+    return record
+
+# Solve the puzzles over a process pool and yield their records as soon as they are available
+# "order" is either "input" (records are yielded in the same order as the puzzles) or "completion" (records are yielded as they finish).
+# At most "window" puzzles are in flight at any time, so the puzzles can be streamed from an arbitrarily large corpus.
+def solve_batch(puzzles: Iterable[Puzzle], workers: Optional[int] = None, order: str = "input",
+                timeout: Optional[float] = None, options: Dict[str, Any] = {}, compact: bool = False, window: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    if order not in ("input", "completion"):
+        raise ValueError(f"Unknown order: {order}")
+    workers = workers or os.cpu_count() or 1
+    window = window or 4 * workers
+    puzzles = iter(puzzles)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit(count: int) -> List[Future]:
+            futures = []
+            for puzzle in puzzles:
+                futures.append(executor.submit(solve_puzzle, puzzle, timeout, options, compact))
+                if len(futures) == count: break
+            return futures
+        if order == "input":
+            pending = deque(submit(window))
+            while pending:
+                record = pending.popleft().result()
+                pending.extend(submit(1))
+                yield record
+        else:
+            pending = set(submit(window))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                pending.update(submit(len(done)))
+                for future in done:
+                    yield future.result()
+
+def main(args: argparse.Namespace):
+    start = time.time() # Track run time
+
+    options = {
+        "load": {"all_different": args.all_different, "matching": args.matching},
+        "solve": {"propagation": args.propagation, "restarts": args.restarts, "seed": args.seed},
+        "cache": args.cache,
+        "backend": args.backend,
+        "max_solutions": args.max_solutions,
+    }
+    records = solve_batch(read_puzzles(args.puzzles), args.workers, args.order, args.timeout, options, args.compact)
+
+    output = sys.stdout if args.output is None else open(args.output, 'w')
+    counts = {}
+    try:
+        for record in records:
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+    finally:
+        if output is not sys.stdout: output.close()
+
+    # Finally print a summary and the elapsed time for the whole batch
+    summary = ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"Done ({summary or 'no puzzles'}) in {time.time() - start} seconds", file=sys.stderr)
+
+if __name__ == "__main__":
+    # Read the arguments from the command line
+    parser = argparse.ArgumentParser(description="Solve a batch of Sudoku puzzles over a process pool")
+    parser.add_argument("puzzles", help="a directory of puzzle files or a file of puzzles separated by empty lines")
+    parser.add_argument("--output", "-o", default=None, help="path to the output JSONL file (default: standard output)")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="number of worker processes (default: number of cores)")
+    parser.add_argument("--order", default="input", choices=["input", "completion"],
+                        help="write the results in input order or as soon as they are completed")
+    parser.add_argument("--timeout", "-t", type=float, default=None, help="maximum time (seconds) to spend on each puzzle")
+    parser.add_argument("--compact", "-c", action="store_true",
+                        help="write each solution as a single line (one character per cell) instead of a list of rows")
+    parser.add_argument("--propagation", "-p", default="forward_checking", choices=sorted(PROPAGATORS),
+                        help="the propagation to run after each assignment")
+    parser.add_argument("--backend", default="csp", choices=["csp", "dlx"],
+                        help="solve with the CSP solver or with the exact cover solver (dancing links)")
+    parser.add_argument("--max-solutions", type=int, default=1,
+                        help="enumerate up to this many solutions of each puzzle and record their number (e.g. 2 checks uniqueness)")
+    parser.add_argument("--restarts", default=None, choices=sorted(RESTART_STRATEGIES),
+                        help="restart the search with randomized tie-breaking using the given node limit sequence")
+    parser.add_argument("--seed", type=int, default=0, help="the random seed of the restarts")
+    parser.add_argument("--cache", default=None,
+                        help="a directory where the compiled puzzles are cached (so reading the same puzzles again skips compiling them)")
+    parser.add_argument("--all-different", action="store_true",
+                        help="use one AllDifferent constraint per row, column and square instead of pairwise constraints")
+    parser.add_argument("--matching", action="store_true",
+                        help="use matching-based filtering for the AllDifferent constraints")
+
+    args = parser.parse_args()
+    try:
+        main(args)
+    except KeyboardInterrupt:
+        print("Goodbye!!")
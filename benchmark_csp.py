@@ -0,0 +1,205 @@
+from typing import Any, Dict, List, Tuple
+from sudoku import SudokuProblem, COMPACT_SIZES, LINE_CHARACTERS
+from CSP import NotInSet
+from CSP_solver import solve
+from helpers.mt19937 import RandomGenerator
+from helpers.utils import fetch_tracked_call_count
+import argparse, gc, json, platform, sys, time, tracemalloc
+
+# The solver configurations that are benchmarked by default.
+# Each one has the keyword arguments of "SudokuProblem.from_cells" ("load") and of "solve" ("solve").
+CONFIGS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "fc": {"load": {}, "solve": {}},
+    "ac3": {"load": {}, "solve": {"propagation": "ac3"}},
+    "ac2001": {"load": {}, "solve": {"propagation": "ac2001"}},
+    "cbj": {"load": {}, "solve": {"backjumping": True, "nogoods": 1000}},
+    "restarts": {"load": {}, "solve": {"restarts": "luby"}},
+    "all_different": {"load": {"all_different": True}, "solve": {}},
+    "matching": {"load": {"all_different": True, "matching": True}, "solve": {}},
+}
+
+# The default number of clues of the generated puzzles of each size
+DEFAULT_CLUES = {4: 6, 9: 30, 16: 130, 25: 400}
+
+# The metrics that are compared against a baseline and the default relative increase that is flagged as a regression.
+# The numbers of nodes are deterministic, so any increase is a regression. The times and memory are noisy.
+TOLERANCES = {"nodes": 0.0, "time": 0.25, "peak_memory": 0.25}
+# The smallest absolute increase of each metric that is flagged (so the noise of very short runs is not reported)
+MIN_INCREASES = {"nodes": 0, "time": 0.01, "peak_memory": 64 * 1024}
+
+# Shuffle a list in-place (Fisher-Yates) using the given random generator
+def shuffle(items: List[Any], rng: RandomGenerator) -> None:
+    for index in range(len(items) - 1, 0, -1):
+        other = rng.int(0, index)
+        items[index], items[other] = items[other], items[index]
+
+# Generate a random complete sudoku grid (as a list of cells row by row).
+# It starts from a valid pattern and shuffles the bands, the rows inside each band, the stacks, the columns inside each stack and the values.
+def generate_grid(size: int, rng: RandomGenerator) -> List[int]:
+    cell_dim = int(size ** 0.5)
+    def lines() -> List[int]:
+        bands, inner = list(range(cell_dim)), list(range(cell_dim))
+        shuffle(bands, rng)
+        result = []
+        for band in bands:
+            shuffle(inner, rng)
+            result.extend(band * cell_dim + line for line in inner)
+        return result
+    rows, cols = lines(), lines()
+    values = list(range(1, size + 1))
+    shuffle(values, rng)
+    pattern = lambda r, c: (cell_dim * (r % cell_dim) + r // cell_dim + c) % size
+    return [values[pattern(r, c)] for r in rows for c in cols]
+
+# Generate a puzzle with a unique solution and (at most) the given number of clues.
+# The cells of a random grid are removed in a random order and a removal is undone if the puzzle would have another solution
+# (this is checked by forbidding the removed value in its cell and making sure that the puzzle becomes unsolvable).
+# If no more cells can be removed, the puzzle keeps more clues than requested.
+def generate_puzzle(size: int, clues: int, rng: RandomGenerator) -> List[int]:
+    if size * size not in COMPACT_SIZES:
+        raise ValueError(f"The size must be one of {sorted(COMPACT_SIZES.values())}, got {size}")
+    cells = generate_grid(size, rng)
+    order = list(range(size * size))
+    shuffle(order, rng)
+    remaining = size * size
+    for index in order:
+        if remaining <= clues: break
+        value, cells[index] = cells[index], 0
+        problem = SudokuProblem.from_cells(cells, size)
+        problem.add_constraint(NotInSet(str(divmod(index, size)), [value]))
+        if solve(problem) is None:
+            remaining -= 1
+        else:
+            cells[index] = value
+    return cells
+
+# Generate "count" puzzles of each size as (size, compact line) pairs
+def generate_suite(sizes: List[int], count: int, clues: Dict[int, int], seed: int) -> List[Tuple[int, str]]:
+    rng = RandomGenerator(seed)
+    return [(size, ''.join(LINE_CHARACTERS[cell] for cell in generate_puzzle(size, clues.get(size, DEFAULT_CLUES[size]), rng)))
+        for size in sizes for _ in range(count)]
+
+# Solve one puzzle and return its number of nodes, its time and whether it was solved.
+# The puzzle is solved "repeat" times and the best time is returned (the other results are the same in every run).
+def run_puzzle(line: str, config: Dict[str, Dict[str, Any]], repeat: int = 1) -> Tuple[int, float, bool]:
+    best = None
+    for _ in range(repeat):
+        problem = SudokuProblem.from_line(line, **config["load"])
+        fetch_tracked_call_count(SudokuProblem.is_complete) # reset the counter
+        start = time.perf_counter()
+        solution = solve(problem, **config["solve"])
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return fetch_tracked_call_count(SudokuProblem.is_complete), best, solution is not None
+
+# Return the peak memory (in bytes) allocated while solving a puzzle.
+# It runs separately from the timed run since tracing the allocations slows the solver down.
+def measure_memory(line: str, config: Dict[str, Dict[str, Any]]) -> int:
+    problem = SudokuProblem.from_line(line, **config["load"])
+    gc.collect() # so that the garbage of the previous runs is not counted
+    tracemalloc.start()
+    try:
+        solve(problem, **config["solve"])
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+# Run the configurations over the puzzles and return one result per configuration and puzzle size
+def run_benchmark(puzzles: List[Tuple[int, str]], configs: Dict[str, Dict[str, Dict[str, Any]]], memory: bool = True, repeat: int = 1) -> List[Dict[str, Any]]:
+    results = []
+    for name, config in configs.items():
+        for size in sorted({size for size, _ in puzzles}):
+            lines = [line for puzzle_size, line in puzzles if puzzle_size == size]
+            nodes, elapsed, solved, peak = 0, 0.0, 0, 0
+            for line in lines:
+                puzzle_nodes, puzzle_time, puzzle_solved = run_puzzle(line, config, repeat)
+                nodes, elapsed, solved = nodes + puzzle_nodes, elapsed + puzzle_time, solved + puzzle_solved
+                if memory: peak = max(peak, measure_memory(line, config))
+            results.append({
+                "config": name, "size": size, "puzzles": len(lines), "solved": solved, "nodes": nodes, "time": elapsed,
+                "peak_memory": peak if memory else None, "solutions_per_second": solved / elapsed if elapsed > 0 else None,
+            })
+    return results
+
+# Compare the results against a baseline and return a description of every regression.
+# A metric regresses if it grew by more than its tolerance (relative to the baseline) and by at least its minimum increase.
+# The results that are missing from the baseline (or the metrics it does not have) are not compared.
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerances: Dict[str, float] = TOLERANCES) -> List[str]:
+    reference = {(result["config"], result["size"]): result for result in baseline}
+    regressions = []
+    for result in results:
+        base = reference.get((result["config"], result["size"]))
+        if base is None: continue
+        for metric, tolerance in tolerances.items():
+            value, base_value = result.get(metric), base.get(metric)
+            if value is None or base_value is None: continue
+            if value > base_value * (1 + tolerance) and value - base_value >= MIN_INCREASES.get(metric, 0):
+                regressions.append(f"{result['config']} {result['size']}x{result['size']}: {metric} {base_value:g} -> {value:g}")
+    return regressions
+
+def main(args: argparse.Namespace) -> int:
+    clues = dict(DEFAULT_CLUES)
+    for item in args.clues:
+        size, count = item.split('=')
+        clues[int(size)] = int(count)
+    if args.puzzles_file is not None:
+        # reuse the puzzles saved by a previous run, so that the results are comparable with its baseline
+        with open(args.puzzles_file, 'r') as f:
+            puzzles = [(COMPACT_SIZES[len(line.strip())], line.strip()) for line in f if line.strip() and not line.startswith('#')]
+    else:
+        puzzles = generate_suite(args.sizes, args.count, clues, args.seed)
+    if args.save_puzzles is not None:
+        with open(args.save_puzzles, 'w') as f:
+            f.writelines(line + '\n' for _, line in puzzles)
+
+    unknown = [name for name in args.configs if name not in CONFIGS]
+    if unknown:
+        print(f"Unknown configurations: {', '.join(unknown)} (expected some of {', '.join(CONFIGS)})", file=sys.stderr)
+        return 2
+    results = run_benchmark(puzzles, {name: CONFIGS[name] for name in args.configs}, not args.no_memory, args.repeat)
+    report = {"python": platform.python_version(), "platform": platform.platform(), "seed": args.seed, "results": results}
+
+    output = json.dumps(report, indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)["results"]
+        tolerances = {**TOLERANCES, "time": args.tolerance, "peak_memory": args.tolerance}
+        regressions = compare(results, baseline, tolerances)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions: return 1
+        print("No regressions", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.setrecursionlimit(10000) # the search recurses once per variable (625 for a 25x25 puzzle)
+
+    # Read the arguments from the command line
+    parser = argparse.ArgumentParser(description="Benchmark the CSP solver over generated sudoku puzzles with unique solutions")
+    parser.add_argument("--sizes", type=int, nargs='+', default=[4, 9, 16], choices=sorted(DEFAULT_CLUES),
+                        help="the sizes of the generated puzzles")
+    parser.add_argument("--count", "-n", type=int, default=5, help="the number of puzzles of each size")
+    parser.add_argument("--clues", nargs='*', default=[], metavar="SIZE=COUNT",
+                        help=f"the number of clues of the puzzles of a size (default: {' '.join(f'{s}={c}' for s, c in DEFAULT_CLUES.items())})")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the puzzle generator")
+    parser.add_argument("--puzzles-file", default=None, help="read the puzzles (one compact line each) from a file instead of generating them")
+    parser.add_argument("--save-puzzles", default=None, help="save the puzzles (one compact line each) to a file")
+    parser.add_argument("--configs", "-c", nargs='+', default=["fc", "ac3", "cbj"], help=f"the configurations to run ({', '.join(CONFIGS)})")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="solve each puzzle this many times and keep the best time")
+    parser.add_argument("--no-memory", action="store_true", help="do not measure the peak memory (it needs a second run of every puzzle)")
+    parser.add_argument("--output", "-o", default=None, help="path to the output JSON file (default: standard output)")
+    parser.add_argument("--baseline", "-b", default=None, help="a previous output to compare against (the exit code is 1 if there are regressions)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCES["time"],
+                        help="the relative increase in time or memory that is flagged as a regression")
+
+    args = parser.parse_args()
+    try:
+        sys.exit(main(args))
+    except KeyboardInterrupt:
+        print("Goodbye!!")
@@ -0,0 +1,138 @@
+from typing import Any, Callable, Hashable, Iterable, Iterator, List, Optional
+
+# An exact cover problem solved by Knuth's Algorithm X using dancing links (DLX).
+# The matrix has a set of columns (the constraints that must be satisfied exactly once) and a list of rows (the choices),
+# and a solution is a set of rows that covers every column exactly once.
+# The matrix is stored as circular doubly linked lists (one node per 1 in the matrix) that are kept in parallel lists indexed by node
+# (node 0 is the root and the nodes 1 to the number of columns are the column headers). Covering a column unlinks it and the rows
+# that intersect it, and uncovering it links them back in the reverse order, so the search never copies the matrix.
+class ExactCover:
+    nodes: int  # The number of search nodes explored by "solutions" (the number of rows that were selected)
+
+    def __init__(self, columns: Iterable[Hashable]) -> None:
+        self.columns = {key: index + 1 for index, key in enumerate(dict.fromkeys(columns))}
+        count = len(self.columns) + 1
+        self.left = [index - 1 for index in range(count)]
+        self.left[0] = count - 1
+        self.right = [index + 1 for index in range(count)]
+        self.right[-1] = 0
+        self.up = list(range(count))
+        self.down = list(range(count))
+        self.column = list(range(count))
+        self.row = [-1] * count
+        self.size = [0] * count     # The number of rows in each column (only used for the headers)
+        self.names: List[Any] = []  # The name of each row (returned in the solutions)
+        self.nodes = 0
+
+    # Add a row that covers the given columns (which must be keys given to the constructor)
+    # The rows that cover no columns are ignored since they can not change a solution.
+    def add_row(self, name: Any, columns: Iterable[Hashable]) -> None:
+        left, right, up, down = self.left, self.right, self.up, self.down
+        first = None
+        for key in columns:
+            header = self.columns[key]
+            node = len(self.column)
+            self.column.append(header)
+            self.row.append(len(self.names))
+            up.append(up[header])
+            down.append(header)
+            down[up[header]] = node
+            up[header] = node
+            self.size[header] += 1
+            if first is None:
+                first = node
+                left.append(node)
+                right.append(node)
+            else:
+                left.append(left[first])
+                right.append(first)
+                right[left[first]] = node
+                left[first] = node
+        if first is not None:
+            self.names.append(name)
+
+    # Lazily yield every solution as a list of row names (in the order they were selected).
+    # The search always branches on the column with the fewest rows, and it is iterative so it works for any number of columns.
+    # If "on_node" is given, it is called after every selected row (e.g. to enforce a time budget by raising an exception).
+    # If it raises, the matrix is left partially covered, so the same instance can not be searched again.
+    def solutions(self, limit: Optional[int] = None, on_node: Optional[Callable[[], None]] = None) -> Iterator[List[Any]]:
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+
+        def cover(header: int) -> None:
+            right[left[header]], left[right[header]] = right[header], left[header]
+            row = down[header]
+            while row != header:
+                node = right[row]
+                while node != row:
+                    down[up[node]], up[down[node]] = down[node], up[node]
+                    size[column[node]] -= 1
+                    node = right[node]
+                row = down[row]
+
+        def uncover(header: int) -> None:
+            row = up[header]
+            while row != header:
+                node = left[row]
+                while node != row:
+                    size[column[node]] += 1
+                    down[up[node]] = up[down[node]] = node
+                    node = left[node]
+                row = up[row]
+            right[left[header]] = left[right[header]] = header
+
+        # select a row: cover the other columns of the row (its own column is already covered)
+        def select(row: int) -> None:
+            node = right[row]
+            while node != row:
+                cover(column[node])
+                node = right[node]
+
+        def unselect(row: int) -> None:
+            node = left[row]
+            while node != row:
+                uncover(column[node])
+                node = left[node]
+
+        count = 0
+        chosen: List[int] = []  # The selected row nodes (one per level of the search)
+        while True:
+            if limit is not None and count >= limit: return
+            if right[0] == 0:
+                count += 1
+                yield [self.names[self.row[node]] for node in chosen]
+                backtrack = True
+            else:
+                # choose the column with the fewest rows
+                header, best = right[0], size[right[0]]
+                candidate = right[header]
+                while candidate != 0 and best > 1:
+                    if size[candidate] < best:
+                        header, best = candidate, size[candidate]
+                    candidate = right[candidate]
+                cover(header)
+                row = down[header]
+                if row != header:
+                    self.nodes += 1
+                    if on_node is not None: on_node()
+                    chosen.append(row)
+                    select(row)
+                    backtrack = False
+                else:
+                    uncover(header)
+                    backtrack = True
+            if backtrack:
+                # move to the next row of the deepest column that has one (undoing the levels that are exhausted)
+                while chosen:
+                    row = chosen.pop()
+                    unselect(row)
+                    header = column[row]
+                    row = down[row]
+                    if row != header:
+                        self.nodes += 1
+                        if on_node is not None: on_node()
+                        chosen.append(row)
+                        select(row)
+                        break
+                    uncover(header)
+                else:
+                    return
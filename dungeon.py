@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from copy import deepcopy
-from typing import Iterable, List, Optional, Set, Tuple
+from typing import Hashable, Iterable, List, Optional, Set, Tuple
 from enum import Enum
 
 from mathutils import Direction, Point
@@ -153,7 +153,31 @@ class DungeonGame(Game[DungeonState, Direction]):
             return [direction for direction, position in positions if position in state.layout.walkable and position not in monster_locations]
 
     def get_successor(self, state: DungeonState, action: Direction) -> DungeonState:
-        state = deepcopy(state)
+        state = DungeonGame._copy_state(state)
+        return DungeonGame._apply_action(state, action)
+
+    # The successors are built directly from copies of the state (see "_copy_state") without going through "get_successor".
+    def get_successors(self, state: DungeonState) -> List[Tuple[Direction, DungeonState]]:
+        copy_state, apply_action = DungeonGame._copy_state, DungeonGame._apply_action
+        return [(action, apply_action(copy_state(state), action)) for action in self.get_actions(state)]
+
+    # Returns a copy of the state whose player, inventory, item sets and monsters can be modified without changing the original.
+    # The layout and the points are immutable, so they are shared. A state is copied for every successor, so this is done
+    # field by field instead of using the generic (and much slower) deepcopy.
+    @staticmethod
+    def _copy_state(state: DungeonState) -> DungeonState:
+        player = state.player
+        inventory = player.inventory
+        return DungeonState(
+            state.time, state.turn, state.layout,
+            Player(player.position, player.alive, Player.Inventory(inventory.daggers, inventory.coins, inventory.keys)),
+            set(state.coins), set(state.daggers), set(state.keys),
+            [Monster(monster.position, monster.alive) for monster in state.monsters]
+        )
+
+    # Apply an action to a (copied) state in-place and return it
+    @staticmethod
+    def _apply_action(state: DungeonState, action: Direction) -> DungeonState:
         current_turn = state.turn
         if current_turn == 0:
             # This action is done by the player
@@ -203,6 +227,45 @@ class DungeonGame(Game[DungeonState, Direction]):
             state.time += 1
         return state
 
+    # The features of a state are the player position, inventory and whether it is dead, the remaining coins, daggers and keys,
+    # the position and alive flag of each monster, the turn and the time (since the score depends on it).
+    def get_features(self, state: DungeonState) -> Iterable[Hashable]:
+        player = state.player
+        yield ("player", player.position)
+        if not player.alive: yield ("dead",)
+        yield ("daggers", player.inventory.daggers)
+        yield ("coins", player.inventory.coins)
+        yield ("keys", player.inventory.keys)
+        for position in state.coins: yield ("coin", position)
+        for position in state.daggers: yield ("dagger", position)
+        for position in state.keys: yield ("key", position)
+        for index, monster in enumerate(state.monsters):
+            yield ("monster", index, monster.position, monster.alive)
+        yield ("turn", state.turn)
+        yield ("time", state.time)
+
+    # An action only moves the player or one monster, so only the items at the new player position and the monsters can change
+    # (a feature that appears twice cancels out, e.g. when the turn does not change).
+    def get_changed_features(self, state: DungeonState, action: Direction, successor: DungeonState) -> Iterable[Hashable]:
+        before, after = state.player, successor.player
+        changes = [("turn", state.turn), ("turn", successor.turn)]
+        if state.time != successor.time:
+            changes += [("time", state.time), ("time", successor.time)]
+        if before.position != after.position:
+            changes += [("player", before.position), ("player", after.position)]
+        if before.alive != after.alive:
+            changes.append(("dead",))
+        for name in ("daggers", "coins", "keys"):
+            old, new = getattr(before.inventory, name), getattr(after.inventory, name)
+            if old != new: changes += [(name, old), (name, new)]
+        position = after.position
+        for feature, old, new in (("coin", state.coins, successor.coins), ("dagger", state.daggers, successor.daggers), ("key", state.keys, successor.keys)):
+            if position in old and position not in new: changes.append((feature, position))
+        for index, (old, new) in enumerate(zip(state.monsters, successor.monsters)):
+            if old != new:
+                changes += [("monster", index, old.position, old.alive), ("monster", index, new.position, new.alive)]
+        return changes
+
     # Read a dungeon problem from text containing a grid of tiles
     @staticmethod
     def from_text(text: str) -> 'DungeonGame':
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Generic, Iterable, List, Optional, Tuple, TypeVar, Union
+from typing import Callable, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar, Union
 from helpers.utils import CacheContainer, with_cache
 
 # S and A are used for generic typing where S represents the state type and A represents the action type
@@ -48,6 +48,24 @@ class Game(ABC, Generic[S, A], CacheContainer):
     def get_successor(self, state: S, action: A) -> S:
         pass
 
+    # This function returns a list of (action, successor) pairs for all the possible actions from the given state.
+    # Searches that need all the children of a state (e.g. to sort them) should call it once and reuse the children,
+    # and games can override it to share the work between the siblings.
+    def get_successors(self, state: S) -> List[Tuple[A, S]]:
+        return [(action, self.get_successor(state, action)) for action in self.get_actions(state)]
+
+    # This function returns the features of a state that are used to compute its Zobrist hash (see "transposition.py").
+    # Two states must have the same features if and only if they are equal.
+    # It is only needed by the searches that use a transposition table, so the games that do not support them do not override it.
+    def get_features(self, state: S) -> Iterable[Hashable]:
+        raise NotImplementedError(f"{type(self).__name__} does not support transposition tables")
+
+    # This function returns the features that were removed from or added to a state by an action (the symmetric difference
+    # of their features), so the hash of the successor can be updated incrementally.
+    # Games should override it to only look at the parts of the state that an action can change.
+    def get_changed_features(self, state: S, action: A, successor: S) -> Iterable[Hashable]:
+        return set(self.get_features(state)).symmetric_difference(self.get_features(successor))
+
 # A heuristic function which estimates the value of a given state for a certain agent within a certain game.
 # E.g. if the heuristic function returns a high value for a certain agent, it should return low values for their enemies.
 HeuristicFunction = Callable[[Game[S, A], S, int], float]
\ No newline at end of file
@@ -36,6 +36,10 @@ class Point:
     def __deepcopy__(self, memo):
         return self
 
+    # a frozen dataclass with slots can not be unpickled field by field, so it is pickled as a constructor call
+    def __reduce__(self):
+        return (Point, (self.x, self.y))
+
 # This is a helper function to compute the manhattan distance between 2 points
 def manhattan_distance(p1: Point, p2: Point) -> int:
     return abs(p1.x - p2.x) + abs(p1.y - p2.y)
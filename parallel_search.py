@@ -0,0 +1,168 @@
+from typing import Any, Dict, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from game import HeuristicFunction, Game, S, A
+import search
+import math, multiprocessing
+
+# A root-parallel driver for the game searches of "search.py": the subtrees below the root (or below the first two plies)
+# are searched in separate processes and their values are combined exactly like the serial search combines them
+# (in the order of the actions), so it returns the same value and action as the serial search, including the tie-breaks.
+# The game, the states and the heuristic are pickled to be sent to the workers, so the heuristic must be a module-level function.
+# Since the workers explore the nodes, the nodes explored by the last search are counted in "nodes" (the calls to "is_terminal"
+# in the workers, while the ones in this process are still counted by the game as usual).
+
+# The serial searches that can run in parallel
+ALGORITHMS = {"minimax", "alphabeta", "expectimax"}
+
+# Search a subtree in a worker and return its value and the number of explored nodes (the calls to "game.is_terminal")
+# "alpha" and "beta" are only used by alphabeta.
+def _search_subtree(algorithm: str, game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int,
+        alpha: float, beta: float) -> Tuple[float, int]:
+    is_terminal = game.is_terminal
+    nodes = 0
+    def counted_is_terminal(state):
+        nonlocal nodes
+        nodes += 1
+        return is_terminal(state)
+    game.is_terminal = counted_is_terminal
+    if algorithm == "alphabeta":
+        value, _ = search.alphabetasearch(game, state, heuristic, alpha, beta, max_depth)
+    else:
+        value, _ = getattr(search, algorithm)(game, state, heuristic, max_depth)
+    return value, nodes
+
+# The search function: "RootParallelSearch('alphabeta')" can be used wherever "search.alphabeta" is (e.g. by a SearchAgent).
+# The workers are kept between the calls (e.g. for all the moves of a game), so it should be closed (or used in a "with" block).
+class RootParallelSearch:
+    nodes: int # The number of nodes explored by the workers during the last search
+
+    def __init__(self, algorithm: str, workers: Optional[int] = None) -> None:
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"The algorithm must be one of {', '.join(sorted(ALGORITHMS))}, got {algorithm}")
+        self.algorithm = algorithm
+        self.workers = workers or multiprocessing.cpu_count()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.nodes = 0
+
+    def close(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> 'RootParallelSearch':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __call__(self, game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1) -> Tuple[float, A]:
+        self.nodes = 0
+        if self.algorithm == "alphabeta":
+            return self.__alphabeta(game, state, heuristic, max_depth)
+        # split the first two plies if the root does not have an action for every worker
+        plies = 1 if len(game.get_actions(state)) >= self.workers else 2
+        tree = self.__expand(game, state, heuristic, max_depth, plies)
+        return self.__combine(game, tree)
+
+    def __submit(self, game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int,
+            alpha: float = -math.inf, beta: float = math.inf) -> Future:
+        return self.executor.submit(_search_subtree, self.algorithm, game, state, heuristic, max_depth, alpha, beta)
+
+    def __result(self, future: Future) -> float:
+        value, nodes = future.result()
+        self.nodes += nodes
+        return value
+
+    # Expand the first plies of the tree (in this process) and submit the subtrees below them to the workers.
+    # A node is (state, value, action) if it is a leaf of the expanded plies (a terminal state or the depth limit),
+    # (state, children) if it is expanded, where children is a list of (action, node), or a future of a submitted subtree.
+    # The terminal and depth checks are the same as the serial search, so the same nodes are explored.
+    def __expand(self, game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int, plies: int) -> Any:
+        terminal, values = game.is_terminal(state)
+        if terminal:
+            return (state, values[0], None)
+        if max_depth == 0:
+            return (state, heuristic(game, state, 0), None)
+        children = []
+        for action, child in game.get_successors(state):
+            if plies > 1:
+                children.append((action, self.__expand(game, child, heuristic, max_depth - 1, plies - 1)))
+            else:
+                # the serial searches check whether the child is terminal first, so it is done by the worker too
+                children.append((action, self.__submit(game, child, heuristic, max_depth - 1)))
+        return (state, children)
+
+    # Compute the value of an expanded node from the values of its children, in the same order and with the same arithmetic
+    # as the serial search (e.g. expectimax rounds the values of the max nodes and sums the chance nodes in order)
+    def __combine(self, game: Game[S, A], node: Any) -> Tuple[float, A]:
+        if isinstance(node, Future):
+            return self.__result(node), None
+        if len(node) == 3:
+            _, value, action = node
+            return value, action
+        state, children = node
+        values = [(action, self.__combine(game, child)[0]) for action, child in children]
+        agent = game.get_turn(state)
+        if self.algorithm == "expectimax" and agent != 0:
+            value, prob = 0, 1 / len(values)
+            for _, child_value in values:
+                value += child_value * prob
+            return value, None
+        value, act = (-math.inf if agent == 0 else math.inf), None
+        for action, child_value in values:
+            if agent == 0:
+                child_value = max(value, child_value)
+                if self.algorithm == "expectimax": child_value = round(child_value, 3)
+            else:
+                child_value = min(value, child_value)
+            if child_value != value:
+                value, act = child_value, action
+        return value, act
+
+    # Alpha-beta with "young brothers wait": the first child of the root is searched first (in this process) to get a bound,
+    # then the other children are searched by the workers. Each child is submitted with the best value known when it starts,
+    # so the later children still prune. To keep the tie-break of the serial search (the first action that reaches the best value),
+    # the window of every child is widened by the smallest possible amount, so a child that ties with the bound returns its
+    # exact value, and the first action (in the order of the actions) with the best exact value is returned.
+    def __alphabeta(self, game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int) -> Tuple[float, A]:
+        terminal, values = game.is_terminal(state)
+        if terminal:
+            return values[0], None
+        if max_depth == 0:
+            return heuristic(game, state, 0), None
+        maximize = game.get_turn(state) == 0
+        children = game.get_successors(state)
+        if not children:
+            # a state without actions keeps the initial value of its node (like the fold of minimax and expectimax above)
+            return (-math.inf if maximize else math.inf), None
+        results: Dict[int, float] = {}
+        _, first_child = children[0]
+        results[0], _ = search.alphabetasearch(game, first_child, heuristic, -math.inf, math.inf, max_depth - 1)
+        best = results[0]
+
+        def submit(index: int) -> Future:
+            if maximize:
+                return self.__submit(game, children[index][1], heuristic, max_depth - 1, math.nextafter(best, -math.inf), math.inf)
+            return self.__submit(game, children[index][1], heuristic, max_depth - 1, -math.inf, math.nextafter(best, math.inf))
+
+        # keep one child per worker in flight, so the children that start later get the better bounds
+        remaining = iter(range(1, len(children)))
+        pending = {}
+        for index in remaining:
+            pending[submit(index)] = index
+            if len(pending) >= self.workers: break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                value = self.__result(future)
+                results[pending.pop(future)] = value
+                best = max(best, value) if maximize else min(best, value)
+            for index in remaining:
+                pending[submit(index)] = index
+                if len(pending) >= self.workers: break
+
+        # the children that failed low (or high) returned a value that is strictly worse than the best value, so they are never chosen
+        value, action = None, None
+        for index, (child_action, _) in enumerate(children):
+            child_value = results[index]
+            if value is None or (child_value > value if maximize else child_value < value):
+                value, action = child_value, child_action
+        return value, action
@@ -16,16 +16,31 @@ def colored_dungeon(level: str):
     level = level.replace(DungeonTile.DAGGER, f'{bcolors.BRIGHT_GREEN}{DungeonTile.DAGGER}{bcolors.ENDC}')
     return f"{header}\n{level}"
 
+# The zero heuristic is a module-level function (not a lambda) so that it can be sent to the parallel search workers
+def zero_heuristic(*_) -> float:
+    return 0
+
 # Return the heuristic selected by the user
 def get_heuristic(name: str):
     if name == "zero":
-        return lambda *_: 0
+        return zero_heuristic
     if name == "heuristic":
         from dungeon import dungeon_heuristic
         return dungeon_heuristic
     print(f"Requested Heuristic '{name}' is invalid")
     exit(-1)
 
+# If requested, give a transposition table to a search function (it is kept across the moves of the agent)
+def with_transposition_table(search_fn, args: argparse.Namespace):
+    if args.transposition == 0: return search_fn
+    from transposition import TranspositionTable
+    table = TranspositionTable(args.transposition)
+    def search_with_table(game, state, heuristic, max_depth):
+        table.new_search()
+        return search_fn(game, state, heuristic, max_depth, table)
+    search_with_table.table = table
+    return search_with_table
+
 # Create an agent based on the user selections
 def create_agent(args: argparse.Namespace):
     agent_type: str = args.agent
@@ -53,22 +68,32 @@ def create_agent(args: argparse.Namespace):
         from search import greedy
         heuristic = get_heuristic(args.heuristic)
         return SearchAgent(greedy, heuristic, -1)
+    # with a time budget, the agent deepens its search until the time is over (and "--depth" is only an upper limit)
+    depth = args.depth if args.depth is not None else (5 if args.time_per_move is None else -1)
+    if args.workers is not None and agent_type in ("minimax", "alphabeta", "expectimax"):
+        # the subtrees below the root are searched by a pool of processes (see "parallel_search.py")
+        from parallel_search import RootParallelSearch
+        return SearchAgent(RootParallelSearch(agent_type, args.workers), get_heuristic(args.heuristic), depth)
     if agent_type == "minimax":
         from search import minimax
         heuristic = get_heuristic(args.heuristic)
-        return SearchAgent(minimax, heuristic, args.depth)
+        return SearchAgent(minimax, heuristic, depth, args.time_per_move)
     if agent_type == "alphabeta":
         from search import alphabeta
         heuristic = get_heuristic(args.heuristic)
-        return SearchAgent(alphabeta, heuristic, args.depth)
+        return SearchAgent(with_transposition_table(alphabeta, args), heuristic, depth, args.time_per_move)
     if agent_type == "alphabeta_order":
         from search import alphabeta_with_move_ordering
         heuristic = get_heuristic(args.heuristic)
-        return SearchAgent(alphabeta_with_move_ordering, heuristic, args.depth)
+        return SearchAgent(alphabeta_with_move_ordering, heuristic, depth, args.time_per_move)
+    if agent_type == "alphabeta_history":
+        from search import alphabeta_with_history_ordering
+        heuristic = get_heuristic(args.heuristic)
+        return SearchAgent(with_transposition_table(alphabeta_with_history_ordering, args), heuristic, depth, args.time_per_move)
     if agent_type == "expectimax":
         from search import expectimax
         heuristic = get_heuristic(args.heuristic)
-        return SearchAgent(expectimax, heuristic, args.depth)
+        return SearchAgent(with_transposition_table(expectimax, args), heuristic, depth, args.time_per_move)
     print(f"Requested Agent '{agent_type}' is invalid")
     exit(-1)
 
@@ -106,16 +131,20 @@ def main(args: argparse.Namespace):
 
         fetch_tracked_call_count(DungeonGame.is_terminal) # Clear the call counter
         
+        turn = game.get_turn(state) # get the current turn
+
         # if this is the turn of the first player, increment the step counter
         if turn == 0: step += 1
 
-        turn = game.get_turn(state) # get the current turn
         agent = agents[turn] # get the agent that will play the current turn
         action = agent.act(game, state) # Request an action from the agent
         
         # Get the number of explored nodes, if the current agent is a search agent
         if isinstance(agent, SearchAgent):
-            print("Explored Nodes:", fetch_tracked_call_count(DungeonGame.is_terminal))
+            print("Explored Nodes:", fetch_tracked_call_count(DungeonGame.is_terminal) + getattr(agent.search_fn, "nodes", 0))
+            if agent.time_per_move is not None: print("Search Depth:", agent.completed_depth)
+            table = getattr(agent.search_fn, "table", None)
+            if table is not None: print("Transposition Table:", table)
         
         # Apply the action to the state
         state = game.get_successor(state, action)
@@ -127,23 +156,37 @@ def main(args: argparse.Namespace):
     # Finally print the elapsed time for the whole process
     print(f"Elapsed time: {time.time() - start} seconds")
 
+    # stop the workers of the parallel search (if any)
+    close = getattr(agents[0].search_fn, "close", None) if isinstance(agents[0], SearchAgent) else None
+    if close is not None: close()
+
 
 if __name__ == "__main__":
     # Read the arguments from the command line
     parser = argparse.ArgumentParser(description="Play Dungeon as Human or AI")
     parser.add_argument("level", help="path to the dungeon to play")
     parser.add_argument("--agent", "-a", default="human",
-                        choices=['human', 'greedy', 'random', 'minimax', 'alphabeta', 'alphabeta_order', 'expectimax'],
+                        choices=['human', 'greedy', 'random', 'minimax', 'alphabeta', 'alphabeta_order', 'alphabeta_history', 'expectimax'],
                         help="the agent that will play the game")
     parser.add_argument("--heuristic", '-hf', default="zero",
                         choices=["zero", "heuristic"],
                         help="choose the heuristic to use")
-    parser.add_argument("--depth", "-d", type=int, default=5, help="How deep the algorithms should search")
+    parser.add_argument("--depth", "-d", type=int, default=None,
+                        help="How deep the algorithms should search (default: 5, or no limit if there is a time per move)")
+    parser.add_argument("--time-per-move", "-t", type=float, default=None,
+                        help="search deeper and deeper until this many milliseconds are over and play the deepest result (iterative deepening)")
+    parser.add_argument("--transposition", "-tt", type=int, default=0,
+                        help="the number of entries of the transposition table used by alphabeta, alphabeta_history and expectimax (0 disables it)")
     parser.add_argument("--ansicolors", "-ac", action="store_true",
                         help="Print the dungeon on the console with ANSI colors (only works on some terminals)")
     parser.add_argument("--sleep", "-s", type=float, default=0, help="How much time (seconds) to wait between actions")
 
+    parser.add_argument("--workers", "-w", type=int, default=None,
+                        help="search the subtrees of the root in parallel with this many processes (minimax, alphabeta and expectimax only)")
+
     args = parser.parse_args()
+    if args.workers is not None and (args.time_per_move is not None or args.transposition != 0):
+        parser.error("--workers can not be combined with --time-per-move or --transposition")
     try:
         main(args)
     except KeyboardInterrupt:
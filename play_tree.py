@@ -1,4 +1,5 @@
 import time
+from typing import Optional
 from tree import TreeGame, TreeNode, tree_heuristic
 from agents import HumanAgent, SearchAgent, RandomAgent
 from helpers.utils import fetch_recorded_calls
@@ -18,7 +19,8 @@ def get_heuristic(name: str):
     exit(-1)
 
 # Create an agent based on the user selections
-def create_agent(agent_type: str, heuristic_type: str):
+# If "time_per_move" (milliseconds) is given, the search agents use iterative deepening within this time budget
+def create_agent(agent_type: str, heuristic_type: str, time_per_move: Optional[float] = None):
     if agent_type == "human":
         # This function reads the action from the user (human)
         def tree_user_action(game: TreeGame, state: TreeNode) -> int:
@@ -37,16 +39,19 @@ def create_agent(agent_type: str, heuristic_type: str):
         return HumanAgent(tree_user_action)
     if agent_type == "minimax":
         from search import minimax
-        return SearchAgent(minimax)
+        return SearchAgent(minimax, time_per_move=time_per_move)
     if agent_type == "alphabeta":
         from search import alphabeta
-        return SearchAgent(alphabeta)
+        return SearchAgent(alphabeta, time_per_move=time_per_move)
     if agent_type == "alphabeta_order":
         from search import alphabeta_with_move_ordering
-        return SearchAgent(alphabeta_with_move_ordering, get_heuristic(heuristic_type))
+        return SearchAgent(alphabeta_with_move_ordering, get_heuristic(heuristic_type), time_per_move=time_per_move)
+    if agent_type == "alphabeta_history":
+        from search import alphabeta_with_history_ordering
+        return SearchAgent(alphabeta_with_history_ordering, time_per_move=time_per_move)
     if agent_type == "expectimax":
         from search import expectimax
-        return SearchAgent(expectimax)
+        return SearchAgent(expectimax, time_per_move=time_per_move)
     if agent_type == "random":
         return RandomAgent(seed_gen.generate())
     print(f"Requested Agent '{agent_type}' is invalid")
@@ -63,7 +68,7 @@ def main(args: argparse.Namespace):
     
     # create the agents that will play the game
     agent_types = [args.agent, args.adversary]
-    agents = [create_agent(agent_type, args.heuristic) for agent_type in agent_types]
+    agents = [create_agent(agent_type, args.heuristic, args.time_per_move) for agent_type in agent_types]
     
     step = 0 # This will store the current step
     
@@ -81,10 +86,11 @@ def main(args: argparse.Namespace):
         
         fetch_recorded_calls(TreeGame.is_terminal) # Clear the recorded calls
         
+        turn = game.get_turn(state) # get the current turn
+
         # if this is the turn of the first player, increment the step counter
         if turn == 0: step += 1
         
-        turn = game.get_turn(state) # get the current turn
         agent = agents[turn] # get the agent that will play the current turn
         action = agent.act(game, state) # Request an action from the agent
         
@@ -115,10 +121,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Play tree as Human or AI")
     parser.add_argument("tree", help="path to the tree to play")
     parser.add_argument("--agent", "-a", default="human",
-                        choices=['human', 'minimax', 'alphabeta', 'alphabeta_order', 'expectimax', 'random'],
+                        choices=['human', 'minimax', 'alphabeta', 'alphabeta_order', 'alphabeta_history', 'expectimax', 'random'],
                         help="the agent that will play the game")
     parser.add_argument("--adversary", "-adv", default="human",
-                        choices=['human', 'minimax', 'alphabeta', 'alphabeta_order', 'expectimax', 'random'],
+                        choices=['human', 'minimax', 'alphabeta', 'alphabeta_order', 'alphabeta_history', 'expectimax', 'random'],
                         help="the agent that will play as your adversary (enemy) the game")
     parser.add_argument("--heuristic", '-hf', default="zero",
                         choices=["zero", "heuristic"],
@@ -126,6 +132,8 @@ if __name__ == "__main__":
     parser.add_argument("--show-pruning", "-sp", action='store_true', default=False,
                         help="Draw the pruned tree in case the agent uses Alpha Beta pruning")
     parser.add_argument("--sleep", "-s", type=float, default=0, help="How much time (seconds) to wait between actions")
+    parser.add_argument("--time-per-move", "-t", type=float, default=None,
+                        help="search deeper and deeper until this many milliseconds are over and play the deepest result (iterative deepening)")
 
     args = parser.parse_args()
     try:
@@ -0,0 +1,81 @@
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from CSP import Assignment, Problem
+from CSP_solver import solve
+import multiprocessing
+
+# The default portfolio: different heuristic settings win on different problems, so they are raced against each other.
+# Each configuration is a dictionary of keyword arguments for "solve".
+DEFAULT_PORTFOLIO: List[Dict[str, Any]] = [
+    {},
+    {"propagation": "ac3"},
+    {"restarts": "luby", "seed": 1},
+    {"restarts": "luby", "seed": 2},
+    {"backjumping": True, "nogoods": 1000},
+]
+
+# A worker checks whether the race is over once every this many nodes
+CANCEL_CHECK_INTERVAL = 64
+
+# This exception stops the search of a worker once another worker has finished
+class SearchCancelled(Exception):
+    pass
+
+# The event that is set when the race is over (one per worker process, see "_start_worker")
+_cancelled = None
+
+def _start_worker(cancelled) -> None:
+    global _cancelled
+    _cancelled = cancelled
+
+# Solve the problem with one configuration and return whether the search finished and its result.
+# The cancellation is checked inside "is_complete" since it is called once per node (the same measure used by the autograder).
+def _solve_with(problem: Problem, config: Dict[str, Any]) -> Tuple[bool, Optional[Assignment]]:
+    is_complete = problem.is_complete
+    nodes = 0
+    def cancellable_is_complete(assignment: Assignment) -> bool:
+        nonlocal nodes
+        nodes += 1
+        if nodes % CANCEL_CHECK_INTERVAL == 0 and _cancelled.is_set():
+            raise SearchCancelled()
+        return is_complete(assignment)
+    problem.is_complete = cancellable_is_complete
+    try:
+        return True, solve(problem, **config)
+    except SearchCancelled:
+        return False, None
+
+# Run several configurations of "solve" on the same problem in separate processes and return the result of the first one to finish.
+# Since every configuration is a complete search, the first result is the answer: a solution or None if the problem is unsolvable.
+# The other workers are stopped as soon as the first one finishes.
+# A configuration that raises an error (e.g. backjumping on a problem with non-binary constraints) loses the race,
+# and the error is only raised if every configuration fails (the error of the first configuration is raised).
+# The problem is pickled to be sent to the workers, so its constraints must be picklable: the built-in constraint kinds
+# (e.g. NotEqual and InSet) are, while generic constraints are only picklable if their conditions are (lambdas are not).
+# A SudokuProblem is pickled as its cells (see "SudokuProblem.__reduce__").
+def portfolio_solve(problem: Problem, configs: Optional[List[Dict[str, Any]]] = None, workers: Optional[int] = None) -> Optional[Assignment]:
+    configs = DEFAULT_PORTFOLIO if configs is None else configs
+    if not configs:
+        raise ValueError("The portfolio needs at least one configuration")
+    workers = min(workers or multiprocessing.cpu_count(), len(configs))
+    cancelled = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker, initargs=(cancelled,)) as executor:
+        futures = [executor.submit(_solve_with, problem, config) for config in configs]
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None: continue
+                    finished, result = future.result()
+                    if finished:
+                        return result
+            # every configuration failed
+            for future in futures:
+                if future.exception() is not None:
+                    raise future.exception()
+        finally:
+            # stop the running workers and drop the configurations that did not start yet
+            cancelled.set()
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,101 @@
+from typing import Any, Callable, Optional
+from CSP import AllDifferentConstraint, BinaryRelation, BitDomain, CompiledProblem, Equal, InSet, LessThan, NotEqual, NotInSet, Problem
+import copyreg, hashlib, importlib, io, operator, os, pickle, tempfile
+
+# A binary serialization of a compiled problem and an on-disk cache of them keyed by the content of their source.
+# The whole object graph of the problem is stored, including its constraint index and its compiled view (the arcs, the check functions
+# and the shared support tables), and loading it restores these objects directly: no constructor or setter runs and nothing is recomputed.
+# So loading a problem from the cache skips parsing its source, building its constraint index and compiling it.
+# Only the problems whose constraints are of the built-in kinds (see CSP.py) can be serialized since the generic constraints hold arbitrary functions.
+# The data is encoded using "pickle", but the loader only resolves the classes and functions in "_LOADABLE_GLOBALS"
+# (and the problem class must be one of "PROBLEM_CLASSES"), so loading a (possibly crafted) file never runs arbitrary code or imports other modules.
+
+# The version of the format (the cached files of other versions are ignored and rebuilt)
+FORMAT_VERSION = 2
+
+# The built-in constraint kinds that can be serialized
+CONSTRAINT_KINDS = (InSet, NotInSet, NotEqual, Equal, LessThan, AllDifferentConstraint)
+
+# The problem classes that can be loaded, as (module, class name) pairs. They are imported by name since "sudoku" imports this module.
+PROBLEM_CLASSES = {("CSP", "Problem"), ("sudoku", "SudokuProblem")}
+
+# The classes and functions that a serialized problem can refer to: the problem classes, the built-in constraint kinds,
+# the compiled view and the conditions of the built-in binary relations (e.g. "operator.ne")
+_LOADABLE_GLOBALS = PROBLEM_CLASSES | {(kind.__module__, kind.__qualname__) for kind in (*CONSTRAINT_KINDS, BitDomain, CompiledProblem)} | {
+    (function.__module__, function.__name__) for function in (operator.eq, operator.ne, operator.lt, operator.gt)}
+
+# Stores the problems and the binary and global constraints as their attributes (like any other object) instead of using their "__reduce__"
+# (e.g. a SudokuProblem is normally pickled as its cells and rebuilt by "from_cells", which is what the cache avoids).
+# The unary constraints hold a function made by their constructor, so they are still rebuilt (they are not part of the compiled view).
+class _ProblemPickler(pickle.Pickler):
+    def reducer_override(self, obj: Any) -> Any:
+        if isinstance(obj, (Problem, BinaryRelation, AllDifferentConstraint)):
+            return copyreg.__newobj__, (type(obj),), vars(obj)
+        return NotImplemented
+
+class _ProblemUnpickler(pickle.Unpickler):
+    def find_class(self, module: str, name: str) -> Any:
+        if (module, name) not in _LOADABLE_GLOBALS:
+            raise ValueError(f"{module}.{name} can not be loaded from a serialized problem")
+        return getattr(importlib.import_module(module), name)
+
+# Serialize a problem (including its compiled view) into bytes
+def dumps_problem(problem: Problem) -> bytes:
+    cls = type(problem)
+    if (cls.__module__, cls.__qualname__) not in PROBLEM_CLASSES:
+        raise ValueError(f"Only the problem classes in PROBLEM_CLASSES can be serialized, got {cls.__module__}.{cls.__qualname__}")
+    for constraint in problem.constraints:
+        if type(constraint) not in CONSTRAINT_KINDS:
+            raise ValueError(f"Only the built-in constraint kinds can be serialized, got {type(constraint).__name__}")
+    problem.compile()
+    data = io.BytesIO()
+    _ProblemPickler(data, pickle.HIGHEST_PROTOCOL).dump((FORMAT_VERSION, problem))
+    return data.getvalue()
+
+# Rebuild a problem from the bytes returned by "dumps_problem"
+# The problem is already compiled (so "problem.compile()" returns the stored compiled view).
+def loads_problem(data: bytes) -> Problem:
+    version, problem = _ProblemUnpickler(io.BytesIO(data)).load()
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported problem format version {version}")
+    if not isinstance(problem, Problem):
+        raise ValueError(f"Expected a problem, got {type(problem).__name__}")
+    return problem
+
+# An on-disk cache of serialized problems. Each entry is keyed by a hash of the content of its source (and the options used to build it),
+# so an entry is never stale: if the source changes, it gets a new key.
+class ProblemCache:
+    directory: str
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    # Returns the cache key of a source text and the options that are used to build a problem from it
+    @staticmethod
+    def key(text: str, *options: Any) -> str:
+        digest = hashlib.sha256(text.encode())
+        digest.update(repr(options).encode())
+        return digest.hexdigest()
+
+    # Returns the problem that "build()" returns for the given source text (and options),
+    # loading it from the cache if possible and storing it otherwise.
+    # If the problem can not be serialized (e.g. it has generic constraints), it is returned without being cached.
+    def get(self, text: str, build: Callable[[], Problem], *options: Any) -> Problem:
+        path = os.path.join(self.directory, ProblemCache.key(text, *options) + ".csp")
+        try:
+            with open(path, 'rb') as f:
+                return loads_problem(f.read())
+        except Exception:
+            pass # missing, corrupted (decoding a damaged file can fail in many ways) or written by another version: rebuild it
+        problem = build()
+        try:
+            data = dumps_problem(problem)
+        except ValueError:
+            return problem
+        # write to a temporary file first so that concurrent readers (e.g. batch workers) never see a partial entry
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(handle, 'wb') as f:
+            f.write(data)
+        os.replace(temporary, path)
+        return problem
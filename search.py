@@ -1,6 +1,7 @@
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
 from game import HeuristicFunction, Game, S, A
 from helpers.utils import NotImplemented
+from transposition import TranspositionTable
 
 #TODO: Import any modules you want to use
 import math
@@ -10,6 +11,25 @@ import math
 
 # All the search functions should return the expected tree value and the best action to take based on the search results
 
+# "alphabeta" and "expectimax" can also take a transposition table (see "transposition.py") which stores the result of every
+# searched state, so a state that is reached again through another move order is not expanded again. It never changes the returned
+# value or action, but it reduces the number of explored nodes, so it is disabled by default.
+# The table keeps its entries between calls (they are keyed by the remaining depth), so an agent can reuse it for its next moves.
+
+# Search a child of a state and return its value and best action, using the transposition table if there is one.
+# "window" holds the extra arguments of the search function (alpha and beta for alpha-beta) and "key" is the hash of the parent.
+def _search_child(search, game: Game[S, A], state: S, action: A, child: S, heuristic: HeuristicFunction, window: tuple, max_depth: int,
+        table: Optional[TranspositionTable], key: Optional[int]):
+    if table is None:
+        return search(game, child, heuristic, *window, max_depth)
+    child_key = table.child_hash(game, key, state, action, child)
+    stored = table.lookup(child_key, max_depth, *window)
+    if stored is not None:
+        return stored
+    value, act = search(game, child, heuristic, *window, max_depth, table, child_key)
+    table.store(child_key, max_depth, value, act, *window)
+    return value, act
+
 # This is a simple search function that looks 1-step ahead and returns the action that lead to highest heuristic value.
 # This algorithm is bad if the heuristic function is weak. That is why we use minimax search to look ahead for many steps.
 def greedy(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1) -> Tuple[float, A]:
@@ -78,13 +98,15 @@ def minimax(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth:
 
 # Apply Alpha Beta pruning and return the tree value and the best action
 # Hint: Read the hint for minimax.
-def alphabeta(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1) -> Tuple[float, A]:
+def alphabeta(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1, table: Optional[TranspositionTable] = None) -> Tuple[float, A]:
     #TODO: ADD YOUR CODE HERE
-    value,action=alphabetasearch(game,state,heuristic,-math.inf,math.inf,max_depth) #initialize the value of alpha=-infinity and beta=infinity
+    key=table.hash(game,state) if table is not None else None #the hash of the root (the hashes of its descendants are updated from it)
+    value,action=alphabetasearch(game,state,heuristic,-math.inf,math.inf,max_depth,table,key) #initialize the value of alpha=-infinity and beta=infinity
     return value,action #return the final value and action 
 
 #hint: non commented parts are the same as minimax, so go back to minimnax and check the comments 
-def alphabetasearch(game: Game[S, A], state: S, heuristic: HeuristicFunction, alpha,beta,max_depth: int = -1):
+#if there is a transposition table, "key" is the hash of the state
+def alphabetasearch(game: Game[S, A], state: S, heuristic: HeuristicFunction, alpha,beta,max_depth: int = -1, table: Optional[TranspositionTable] = None, key: Optional[int] = None):
     agent = game.get_turn(state)
     if (agent==0): #max turn
         terminal,values = game.is_terminal(state)
@@ -96,7 +118,7 @@ def alphabetasearch(game: Game[S, A], state: S, heuristic: HeuristicFunction, al
         value=-math.inf
         for action in game.get_actions(state):
             child=game.get_successor(state,action)
-            value1,_=alphabetasearch(game,child,heuristic,alpha,beta,max_depth-1)
+            value1,_=_search_child(alphabetasearch,game,state,action,child,heuristic,(alpha,beta),max_depth-1,table,key)
             value1=max(value,value1)
             if value1!= value: #if the value is updated we need to check on the beta condition 
                 value=value1
@@ -115,7 +137,7 @@ def alphabetasearch(game: Game[S, A], state: S, heuristic: HeuristicFunction, al
         value=math.inf
         for action in game.get_actions(state):
             child=game.get_successor(state,action)
-            value1,_=alphabetasearch(game,child,heuristic,alpha,beta,max_depth-1)
+            value1,_=_search_child(alphabetasearch,game,state,action,child,heuristic,(alpha,beta),max_depth-1,table,key)
             value1=min(value,value1)
             if value1!= value: #if the value is updated check on the alpha condition
                 value=value1
@@ -144,12 +166,11 @@ def alphabeta_ordering_search(game: Game[S, A], state: S, heuristic: HeuristicFu
             value=heuristic(game,state,0)
             return value,None
         value=-math.inf
-        #get all the actions and for each action get its successor and hence get its heauristic value and save them in list of tuples
-        #that looks liks that[(heur value,action)]
-        sorted_actions=[(heuristic(game,game.get_successor(state,action),0),action) for action in game.get_actions(state) ] 
+        #get all the actions with their successors and hence get their heauristic values and save them in list of tuples
+        #that looks liks that[(heur value,action,child)], the children are kept so they are not generated again in the loop
+        sorted_actions=[(heuristic(game,child,0),action,child) for action,child in game.get_successors(state) ] 
         sorted_actions.sort(key=lambda i:i[0],reverse=True) #sort the list of tuples according to the heuristic values in descending order 
-        for heur,action in sorted_actions: #loop over the sorted actions and apply the same steps as in alpha beta
-            child=game.get_successor(state,action)
+        for heur,action,child in sorted_actions: #loop over the sorted actions and apply the same steps as in alpha beta
             value1,_=alphabeta_ordering_search(game,child,heuristic,alpha,beta,max_depth-1)
             value1=max(value,value1)
             if value1!= value:
@@ -167,12 +188,11 @@ def alphabeta_ordering_search(game: Game[S, A], state: S, heuristic: HeuristicFu
             value=heuristic(game,state,0)
             return value,None
         value=math.inf
-         #get all the actions and for each action get its successor and hence get its heauristic value and save them in list of tuples
-        #that looks liks that[(heur value,action)]
-        sorted_actions=[(heuristic(game,game.get_successor(state,action),0),action) for action in game.get_actions(state) ]
+        #get all the actions with their successors and hence get their heauristic values and save them in list of tuples
+        #that looks liks that[(heur value,action,child)], the children are kept so they are not generated again in the loop
+        sorted_actions=[(heuristic(game,child,0),action,child) for action,child in game.get_successors(state) ]
         sorted_actions.sort(key=lambda i:i[0])  #sort the list of tuples according to the heuristic values in ascending order 
-        for heur,action in sorted_actions: #loop over the sorted actions and apply the same steps as in alpha beta
-            child=game.get_successor(state,action)
+        for heur,action,child in sorted_actions: #loop over the sorted actions and apply the same steps as in alpha beta
             value1,_=alphabeta_ordering_search(game,child,heuristic,alpha,beta,max_depth-1)
             value1=min(value,value1)
             if value1!= value:
@@ -182,13 +202,101 @@ def alphabeta_ordering_search(game: Game[S, A], state: S, heuristic: HeuristicFu
                     return value,act
                 beta=min(beta,value)
         return value,act
+# The number of killer moves remembered for each ply
+KILLER_SLOTS = 2
+
+# Apply Alpha Beta pruning with cheap move ordering and return the tree value and the best action.
+# Unlike "alphabeta_with_move_ordering", it never evaluates the heuristic or generates a successor just to order the moves.
+# The actions of a node are tried in this order:
+#   1- The best move stored in the transposition table for this state (by this search or a previous, e.g. shallower, one).
+#   2- The killer moves of this ply: the last moves that caused a cutoff in another node at the same depth of the tree.
+#   3- The other moves sorted by their history score: how often (and how deep) each (agent, action) caused a cutoff so far.
+# If no table is given, a small table is used for this call only (if the game supports hashing, see "Game.get_features").
+# The returned value and action are the same as "alphabeta": at the root, the first action (in the order of "game.get_actions")
+# that reaches the best value is returned. To detect the ties, the root actions that come earlier in that order than the
+# current best action are searched with a window that is slightly wider than (alpha, beta), so equal values are exact.
+def alphabeta_with_history_ordering(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1, table: Optional[TranspositionTable] = None) -> Tuple[float, A]:
+    if table is None:
+        table = TranspositionTable(1 << 12)
+    try:
+        root_key = table.hash(game, state)
+    except NotImplementedError:
+        table = root_key = None
+    killers: Dict[int, List[A]] = {}    # The killer moves of each ply (the most recent first)
+    history: Dict[Tuple[int, A], int] = {} # The history score of each (agent, action)
+
+    def order(actions: List[A], agent: int, ply: int, first: Optional[A]) -> List[A]:
+        front = [first] if first is not None and first in actions else []
+        for killer in killers.get(ply, ()):
+            if killer in actions and killer not in front: front.append(killer)
+        rest = [action for action in actions if action not in front]
+        rest.sort(key=lambda action: history.get((agent, action), 0), reverse=True) # stable, so the ties keep their order
+        return front + rest
+
+    def cutoff(action: A, agent: int, ply: int, depth: int) -> None:
+        slots = killers.setdefault(ply, [])
+        if action in slots: slots.remove(action)
+        slots.insert(0, action)
+        del slots[KILLER_SLOTS:]
+        history[(agent, action)] = history.get((agent, action), 0) + (depth * depth if depth > 0 else 1)
+
+    def search(state: S, alpha: float, beta: float, depth: int, ply: int, key: Optional[int]) -> Tuple[float, A]:
+        root = ply == 0
+        if table is not None and not root:
+            stored = table.lookup(key, depth, alpha, beta)
+            if stored is not None: return stored
+        window = alpha, beta
+        terminal, values = game.is_terminal(state)
+        if terminal:
+            value, best = values[0], None
+        elif depth == 0:
+            value, best = heuristic(game, state, 0), None
+        else:
+            agent = game.get_turn(state)
+            maximize = agent == 0
+            actions = list(game.get_actions(state))
+            index = {action: position for position, action in enumerate(actions)} if root else None
+            first = table.best_move(key, depth) if table is not None else None
+            value, best = (-math.inf if maximize else math.inf), None
+            for action in order(actions, agent, ply, first):
+                child = game.get_successor(state, action)
+                child_key = table.child_hash(game, key, state, action, child) if table is not None else None
+                tie_break = root and best is not None and index[action] < index[best]
+                if tie_break and maximize:
+                    child_value, _ = search(child, math.nextafter(alpha, -math.inf), beta, depth - 1, ply + 1, child_key)
+                elif tie_break:
+                    child_value, _ = search(child, alpha, math.nextafter(beta, math.inf), depth - 1, ply + 1, child_key)
+                else:
+                    child_value, _ = search(child, alpha, beta, depth - 1, ply + 1, child_key)
+                if best is None or (child_value > value if maximize else child_value < value) or (tie_break and child_value == value):
+                    value, best = child_value, action
+                if maximize:
+                    if value >= beta:
+                        cutoff(action, agent, ply, depth)
+                        break
+                    alpha = max(alpha, value)
+                else:
+                    if value <= alpha:
+                        cutoff(action, agent, ply, depth)
+                        break
+                    beta = min(beta, value)
+        if table is not None: table.store(key, depth, value, best, *window)
+        return value, best
+
+    return search(state, -math.inf, math.inf, max_depth, 0, root_key)
+
 # Apply Expectimax search and return the tree value and the best action
 # Hint: Read the hint for minimax, but note that the monsters (turn > 0) do not act as min nodes anymore,
 # they now act as chance nodes (they act randomly).
-def expectimax(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1) -> Tuple[float, A]:
+def expectimax(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1, table: Optional[TranspositionTable] = None) -> Tuple[float, A]:
     #TODO: ADD YOUR CODE HERE
+    key=table.hash(game,state) if table is not None else None #the hash of the root (the hashes of its descendants are updated from it)
+    value,action=expectimaxsearch(game,state,heuristic,max_depth,table,key)
+    return value,action
 
-    #the uncommented parts are the same as minimax, so return to it
+#the uncommented parts are the same as minimax, so return to it
+#if there is a transposition table, "key" is the hash of the state
+def expectimaxsearch(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_depth: int = -1, table: Optional[TranspositionTable] = None, key: Optional[int] = None):
     agent = game.get_turn(state)
     if (agent==0):  #max turn 
         terminal,values = game.is_terminal(state)
@@ -200,7 +308,7 @@ def expectimax(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_dep
         value=-math.inf
         for action in game.get_actions(state):
             child=game.get_successor(state,action)
-            value1,_=expectimax(game,child,heuristic,max_depth-1)
+            value1,_=_search_child(expectimaxsearch,game,state,action,child,heuristic,(),max_depth-1,table,key)
             value1=round(max(value,value1),3)  #rounding the values because sometimes the chance node returns values with many decimal places that may be rounded to a near value
             if value1!= value:
                 value=value1
@@ -219,6 +327,6 @@ def expectimax(game: Game[S, A], state: S, heuristic: HeuristicFunction, max_dep
         for action in game.get_actions(state):
             child=game.get_successor(state,action)
             #for every action and current state get the next state and calculate its value by calling the function recursively
-            value1,_=expectimax(game,child,heuristic,max_depth-1)  
+            value1,_=_search_child(expectimaxsearch,game,state,action,child,heuristic,(),max_depth-1,table,key)
             value+=value1*prob #expectation= summation of every value * its probability
         return value,None
\ No newline at end of file
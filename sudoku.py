@@ -1,10 +1,35 @@
-from typing import Dict
-from CSP import Assignment, Problem, UnaryConstraint, BinaryConstraint
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from CSP import AllDifferentConstraint, Assignment, NotEqual, NotInSet, Problem
+from problem_cache import ProblemCache
+from dlx import ExactCover
+import itertools
+
+# The characters used for the values in the compact (one line per puzzle) format. The index of each character is its value.
+LINE_CHARACTERS = ".123456789ABCDEFGHIJKLMNOP"
+# Map each character of the compact format to its value (0 is an empty cell)
+LINE_VALUES = {character: value for value, character in enumerate(LINE_CHARACTERS)}
+LINE_VALUES.update({character.lower(): value for character, value in LINE_VALUES.items()})
+LINE_VALUES['0'] = 0
+# Map the length of a compact line to the size of the puzzle (4x4, 9x9, 16x16 and 25x25)
+COMPACT_SIZES = {size*size: size for size in (4, 9, 16, 25)}
+
+# Check if a (stripped) string is a puzzle in the compact format
+def is_compact_line(text: str) -> bool:
+    return len(text) in COMPACT_SIZES and not any(character.isspace() for character in text)
 
 # A class for the sudoku problem which inherits from the generic CSP problem class
 class SudokuProblem(Problem):
     size: int   # The size of the sudoku puzzle (usually, it is 9). This is needed for printing only.
     clues: Dict[str, int]   # A dictionary of the clues (the fixed values that are already defined in the puzzle). This is needed for printing only.
+    all_different: bool     # The options that the constraints were built with (see "from_cells")
+    matching: bool
+
+    # A puzzle is pickled as its cells and options and the constraints are rebuilt by "from_cells" when it is unpickled.
+    # The current domains are kept (they may have been reduced, e.g. by "one_consistency").
+    # This is much smaller than the constraints, so puzzles are cheap to send to other processes.
+    def __reduce__(self):
+        cells = [self.clues.get(str((r,c)), 0) for r in range(self.size) for c in range(self.size)]
+        return SudokuProblem.from_cells, (cells, self.size, self.all_different, self.matching), {"domains": self.domains}
 
     # Convert an assignment into a string (so that is can be printed or saved).
     def format_assignment(self, assignment: Assignment) -> str:
@@ -17,15 +42,48 @@ class SudokuProblem(Problem):
         lines = [' | '.join(' '.join(group) for group in group_elements(line, cell_dim)) for line in lines]
         return separator.join('\n'.join(group) for group in group_elements(lines, cell_dim))
 
+    # Convert an assignment into a single line of characters (the compact format read by "from_line").
+    # The clues are included and the unassigned cells are written as '.'.
+    def format_line(self, assignment: Assignment) -> str:
+        values = {**assignment, **self.clues}
+        return ''.join(LINE_CHARACTERS[values.get(str((r,c)), 0)] for r in range(self.size) for c in range(self.size))
+
     # Read a sudoku puzzle from a string
+    # The string can either be in the grid format (rows of cells with '|' and '-' separators) or in the compact format (see "from_line").
+    # By default, every row, column and square is expanded into pairwise "not equal" binary constraints.
+    # If "all_different" is True, each of them is represented by a single AllDifferentConstraint instead
+    # (and if "matching" is True, the AllDifferent constraints use the matching-based filtering).
+    # If a cache is given, the compiled puzzle is loaded from it when the same text was already read (see ProblemCache).
     @staticmethod
-    def from_text(text: str) -> 'SudokuProblem':
-        not_equal_condition = lambda a, b: a != b
-        unary_not_equal_condition = lambda f: (lambda v: v != f)
-        
+    def from_text(text: str, all_different: bool = False, matching: bool = False, cache: Optional[ProblemCache] = None) -> 'SudokuProblem':
+        if cache is not None:
+            return cache.get(text, lambda: SudokuProblem.from_text(text, all_different, matching), "SudokuProblem", all_different, matching)
+        stripped = text.strip()
+        if is_compact_line(stripped):
+            return SudokuProblem.from_line(stripped, all_different, matching)
         lines = [line.strip() for line in text.splitlines()]
         lines = [line.replace('| ', '').split() for line in lines if len(line) != 0 and not line.startswith('-')]
-        size = len(lines)
+        cells = [0 if cell == '.' else int(cell) for line in lines for cell in line]
+        return SudokuProblem.from_cells(cells, len(lines), all_different, matching)
+
+    # Read a sudoku puzzle from a single line in the compact format used by public puzzle collections
+    # The line contains one character per cell (row by row) where '.' or '0' is an empty cell,
+    # '1' to '9' are the values 1 to 9 and the letters 'A' to 'P' (or 'a' to 'p') are the values 10 to 25.
+    @staticmethod
+    def from_line(line: str, all_different: bool = False, matching: bool = False) -> 'SudokuProblem':
+        line = line.strip()
+        size = COMPACT_SIZES.get(len(line))
+        if size is None:
+            raise ValueError(f"A compact sudoku line must have {', '.join(map(str, COMPACT_SIZES))} characters, got {len(line)}")
+        try:
+            cells = [LINE_VALUES[character] for character in line]
+        except KeyError as err:
+            raise ValueError(f"Invalid character {err} in a compact sudoku line") from None
+        return SudokuProblem.from_cells(cells, size, all_different, matching)
+
+    # Build a sudoku puzzle from the list of its cells (row by row) where 0 is an empty cell
+    @staticmethod
+    def from_cells(cells: List[int], size: int, all_different: bool = False, matching: bool = False) -> 'SudokuProblem':
         cell_dim = int(size ** 0.5)
         
         domain = set(range(1, size+1))
@@ -41,21 +99,20 @@ class SudokuProblem(Problem):
         fixed_in_cols = [[] for _ in range(size)]
         fixed_in_sqrs = [[] for _ in range(size)]
 
-        for r, line in enumerate(lines):
-            for c, cell in enumerate(line):
-                s = (r//cell_dim) * cell_dim + (c//cell_dim)
-                if cell == '.':
-                    variable = str((r, c))
-                    variables.append(variable)
-                    vars_in_rows[r].append(variable)
-                    vars_in_cols[c].append(variable)
-                    vars_in_sqrs[s].append(variable)
-                else:
-                    value = int(cell)
-                    fixed_in_rows[r].append(value)
-                    fixed_in_cols[c].append(value)
-                    fixed_in_sqrs[s].append(value)
-                    fixed_values[str((r, c))] = value
+        for index, value in enumerate(cells):
+            r, c = divmod(index, size)
+            s = (r//cell_dim) * cell_dim + (c//cell_dim)
+            if value == 0:
+                variable = str((r, c))
+                variables.append(variable)
+                vars_in_rows[r].append(variable)
+                vars_in_cols[c].append(variable)
+                vars_in_sqrs[s].append(variable)
+            else:
+                fixed_in_rows[r].append(value)
+                fixed_in_cols[c].append(value)
+                fixed_in_sqrs[s].append(value)
+                fixed_values[str((r, c))] = value
         
         constraints = []
 
@@ -68,20 +125,81 @@ class SudokuProblem(Problem):
         for pair in var_fixed_pairs:
             for var_list, fixed_list in zip(*pair):
                 for index, variable in enumerate(var_list):
-                   constraints.extend(UnaryConstraint(variable, unary_not_equal_condition(fixed)) for fixed in fixed_list)
-                   constraints.extend(BinaryConstraint((variable, other), not_equal_condition) for other in var_list[index+1:])
+                   if fixed_list:
+                       constraints.append(NotInSet(variable, fixed_list))
+                   if not all_different:
+                       constraints.extend(NotEqual((variable, other)) for other in var_list[index+1:])
+                if all_different and len(var_list) > 1:
+                    constraints.append(AllDifferentConstraint(var_list, matching))
         
         problem = SudokuProblem()
         problem.size = size
         problem.clues = fixed_values
+        problem.all_different = all_different
+        problem.matching = matching
         problem.variables = variables
         problem.domains = {variable:domain.copy() for variable in variables}
         problem.constraints = constraints
         
         return problem
 
+    # Build the exact cover matrix of the puzzle (see ExactCover) where every row is a (variable, value) pair of the current domains
+    # and the columns are the cells, and the values of every row, column and square that are not already given by the clues.
+    # So the rows of a solution form an assignment (e.g. "dict(solution)").
+    # IMPORTANT: The matrix only encodes the sudoku rules and the domains, any other constraint added to the problem is ignored.
+    def exact_cover(self) -> ExactCover:
+        cell_dim = int(self.size ** 0.5)
+        units = lambda r, c, value: (("row", r, value), ("col", c, value), ("sqr", (r//cell_dim) * cell_dim + c//cell_dim, value))
+        cells = [(r, c, str((r, c))) for r, c in itertools.product(range(self.size), repeat=2)]
+        covered, conflicts = set(), []
+        for r, c, name in cells:
+            if name not in self.clues: continue
+            for unit in units(r, c, self.clues[name]):
+                if unit in covered: conflicts.append(unit) # two clues share a unit, so the puzzle has no solution
+                covered.add(unit)
+        rows = []
+        for r, c, name in cells:
+            for value in sorted(self.domains.get(name, ())):
+                columns = units(r, c, value)
+                if not any(unit in covered for unit in columns):
+                    rows.append(((name, value), (("cell", r, c), *columns)))
+        # every variable and every unit value that is not given by a clue must be covered (an uncoverable column means there is no solution)
+        variables = set(self.variables)
+        needed = [("cell", r, c) for r, c, name in cells if name in variables]
+        needed += [unit for unit in itertools.product(("row", "col", "sqr"), range(self.size), range(1, self.size + 1)) if unit not in covered]
+        cover = ExactCover([*needed, *conflicts])
+        for name, columns in rows:
+            cover.add_row(name, columns)
+        return cover
+
+    # Lazily yield the solutions of the puzzle using the exact cover solver (an alternative to "CSP_solver.iter_solutions"
+    # that is usually much faster for sudoku). The solutions have the same format as the ones returned by "CSP_solver.solve".
+    def iter_dlx_solutions(self, limit: Optional[int] = None) -> Iterator[Assignment]:
+        for solution in self.exact_cover().solutions(limit):
+            yield dict(solution)
+
+    # Return the first solution of the puzzle found by the exact cover solver (or None if it has no solution)
+    def solve_dlx(self) -> Optional[Assignment]:
+        return next(self.iter_dlx_solutions(1), None)
+
     # Read a sudoku puzzle from a file
     @staticmethod
-    def from_file(path: str) -> "SudokuProblem":
+    def from_file(path: str, all_different: bool = False, matching: bool = False, cache: Optional[ProblemCache] = None) -> "SudokuProblem":
         with open(path, 'r') as f:
-            return SudokuProblem.from_text(f.read())
\ No newline at end of file
+            return SudokuProblem.from_text(f.read(), all_different, matching, cache)
+
+# Lazily read the puzzles in a file with one compact puzzle per line (see "SudokuProblem.from_line")
+# The file is streamed, so it can contain any number of puzzles. Empty lines and lines starting with '#' are skipped.
+def read_lines(path: str, all_different: bool = False, matching: bool = False) -> Iterator[SudokuProblem]:
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield SudokuProblem.from_line(line, all_different, matching)
+
+# Write one compact line per (problem, assignment) pair to a file
+# If the assignment is None (no solution was found), the puzzle is written as is so that the lines stay aligned with the input.
+def write_lines(path: str, solutions: Iterable[Tuple[SudokuProblem, Optional[Assignment]]]):
+    with open(path, 'w') as f:
+        for problem, assignment in solutions:
+            f.write(problem.format_line(assignment or {}) + '\n')
@@ -0,0 +1,6 @@
+import os, sys
+
+# The modules of the repository are at its root (next to this folder) and the puzzles are loaded relative to it
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
@@ -0,0 +1,32 @@
+import time
+import pytest
+from agents import SearchAgent
+from dungeon import DungeonGame, dungeon_heuristic
+from tree import TreeGame, tree_heuristic
+import search
+
+GAMES = [(TreeGame.from_file(f"trees/tree{index}.json"), tree_heuristic) for index in (1, 2)]
+GAMES += [(DungeonGame.from_file(f"dungeons/dungeon{level}.txt"), dungeon_heuristic) for level in (1, 2, 3, 4)]
+
+# With enough time, iterative deepening returns the same action as a search to the same depth (including the tie-breaks)
+def test_iterative_deepening_returns_the_fixed_depth_action():
+    for search_fn in (search.minimax, search.alphabeta, search.expectimax, search.alphabeta_with_history_ordering):
+        for game, heuristic in GAMES:
+            state = game.get_initial_state()
+            for depth in (2, 4):
+                agent = SearchAgent(search_fn, heuristic, depth, time_per_move=60_000)
+                assert agent.act(game, state) == search_fn(game, state, heuristic, depth)[1]
+                assert "is_terminal" not in vars(game) # the wrapper is removed
+
+# The search stops soon after its budget (the deepening is unlimited, so it only stops because of the time)
+def test_iterative_deepening_respects_the_time_budget():
+    game = DungeonGame.from_file("dungeons/dungeon4.txt")
+    agent = SearchAgent(search.alphabeta, dungeon_heuristic, time_per_move=100)
+    start = time.perf_counter()
+    action = agent.act(game, game.get_initial_state())
+    assert time.perf_counter() - start < 0.5
+    assert action in game.get_actions(game.get_initial_state()) and agent.completed_depth >= 1
+
+def test_iterative_deepening_rejects_depth_zero():
+    with pytest.raises(ValueError):
+        SearchAgent(search.alphabeta, dungeon_heuristic, 0, time_per_move=100)
@@ -0,0 +1,28 @@
+import itertools
+from CSP import AllDifferentConstraint, NotEqual, Problem
+from sudoku import SudokuProblem
+from test_propagation import PUZZLES, solution_set
+
+ENCODINGS = [{}, {"all_different": True}, {"all_different": True, "matching": True}]
+
+# The pairwise "not equal" constraints, the AllDifferent constraints and their matching-based filtering describe the same puzzle
+def test_sudoku_encodings_find_the_same_solutions():
+    for path in PUZZLES:
+        expected = solution_set(SudokuProblem.from_file(path), "forward_checking")
+        for encoding in ENCODINGS[1:]:
+            for propagation in ("forward_checking", "ac3"):
+                assert solution_set(SudokuProblem.from_file(path, **encoding), propagation) == expected
+
+# Two of the variables share two values, so the matching removes these values from the others before the search reaches them
+def test_matching_keeps_every_solution():
+    domains = {"a": {1, 2}, "b": {1, 2}, "c": {1, 2, 3}, "d": {1, 2, 3, 4}, "e": {2, 3, 4, 5}}
+    def problem(constraints):
+        problem = Problem()
+        problem.variables = list(domains)
+        problem.domains = {variable: set(domain) for variable, domain in domains.items()}
+        problem.constraints = constraints
+        return problem
+    expected = solution_set(problem([NotEqual(pair) for pair in itertools.combinations(domains, 2)]), "forward_checking")
+    assert len(expected) == 2
+    for matching in (False, True):
+        assert solution_set(problem([AllDifferentConstraint(list(domains), matching)]), "forward_checking") == expected
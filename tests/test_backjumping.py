@@ -0,0 +1,22 @@
+import glob
+from CSP_solver import solve
+from sudoku import SudokuProblem
+from test_solver_stats import coloring_problem
+
+COLORS = ["red", "green", "blue", "yellow"]
+
+def problems():
+    for path in sorted(glob.glob("sudoku/*.txt")):
+        yield lambda path=path: SudokuProblem.from_file(path)
+    for clique, ring in ((4, 6), (4, 9), (5, 4)):
+        yield lambda clique=clique, ring=ring: coloring_problem(clique, ring, COLORS)
+
+# Backjumping only skips the values that can not lead to a solution, so it returns the first solution of the plain search
+# (or proves that there is none) without exploring more nodes, with and without learning nogoods
+def test_backjumping_finds_the_first_solution():
+    for problem in problems():
+        expected, plain = solve(problem(), return_stats=True)
+        for options in ({"backjumping": True}, {"backjumping": True, "nogoods": 100}):
+            result, stats = solve(problem(), **options, return_stats=True)
+            assert result == expected
+            assert stats.nodes <= plain.nodes
@@ -0,0 +1,19 @@
+from batch_sudoku import read_puzzles, solve_puzzle
+
+# Both backends count the same solutions (4x4_1 and 9x9_1 have several and 4x4_3 and 4x4_4 have none)
+# and agree on the solution of the puzzles that have only one
+def test_backends_agree():
+    for puzzle in read_puzzles("sudoku"):
+        csp = solve_puzzle(puzzle, options={"max_solutions": 3})
+        dlx = solve_puzzle(puzzle, options={"max_solutions": 3, "backend": "dlx"})
+        assert csp["status"] == dlx["status"] == ("solved" if csp["solutions"] else "unsatisfiable")
+        assert csp["solutions"] == dlx["solutions"]
+        if csp["solutions"] == 1:
+            assert csp["solution"] == dlx["solution"]
+
+# The time budget is checked at the nodes of the exact cover search too
+def test_dlx_respects_the_timeout():
+    puzzle = next(read_puzzles("sudoku"))
+    for backend in ("csp", "dlx"):
+        record = solve_puzzle(puzzle, timeout=0, options={"backend": backend})
+        assert record["status"] == "timeout" and record["nodes"] == 1
@@ -0,0 +1,19 @@
+from copy import deepcopy
+from dungeon import DungeonGame
+
+# The successors built directly are the same as the ones of "get_successor" and they share no mutable parts with their parent
+def test_successors_are_independent_copies():
+    for level in (1, 2, 3, 4):
+        game = DungeonGame.from_file(f"dungeons/dungeon{level}.txt")
+        state = game.get_initial_state()
+        for _ in range(30):
+            if game.is_terminal(state)[0] or not game.get_actions(state): break
+            original = deepcopy(state)
+            successors = game.get_successors(state)
+            assert successors == [(action, game.get_successor(state, action)) for action in game.get_actions(state)]
+            for _, child in successors:
+                child.player.inventory.coins += 1
+                child.coins.add(child.player.position)
+                for monster in child.monsters: monster.alive = not monster.alive
+            assert state == original
+            state = game.get_successors(state)[-1][1]
@@ -0,0 +1,21 @@
+from dungeon import DungeonGame, dungeon_heuristic
+from transposition import TranspositionTable
+from tree import TreeGame, tree_heuristic
+import search
+
+GAMES = [(TreeGame.from_file(f"trees/tree{index}.json"), tree_heuristic) for index in (1, 2)]
+GAMES += [(DungeonGame.from_file(f"dungeons/dungeon{level}.txt"), dungeon_heuristic) for level in (1, 2, 3, 4)]
+
+# The move ordering only changes which children are pruned, and the root keeps the tie-break of alphabeta (the first action in the
+# order of the actions that reaches the best value), so it returns the same value and action as alphabeta with and without a table.
+def test_same_results_as_alphabeta():
+    for game, heuristic in GAMES:
+        states = [game.get_initial_state()]
+        states += [child for _, child in game.get_successors(states[0]) if not game.is_terminal(child)[0]]
+        table = TranspositionTable()
+        for state in states:
+            for depth in (1, 2, 3, 4):
+                expected = search.alphabeta(game, state, heuristic, depth)
+                assert search.alphabeta_with_history_ordering(game, state, heuristic, depth) == expected
+                table.new_search()
+                assert search.alphabeta_with_history_ordering(game, state, heuristic, depth, table) == expected
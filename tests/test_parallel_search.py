@@ -0,0 +1,17 @@
+from tree import TreeGame, TreeNode, tree_heuristic
+from parallel_search import RootParallelSearch
+import search
+
+def test_same_result_as_serial_search():
+    game = TreeGame.from_file('trees/tree1.json')
+    for algorithm in ("minimax", "alphabeta", "expectimax"):
+        with RootParallelSearch(algorithm, workers=2) as parallel:
+            state = game.get_initial_state()
+            assert parallel(game, state, tree_heuristic, -1) == getattr(search, algorithm)(game, state, tree_heuristic, -1)
+
+# A root that is not terminal but has no actions keeps the initial value of its node
+def test_root_without_actions():
+    for name, value in (("root", float("-inf")), ("root/A", float("inf"))):
+        game = TreeGame(TreeNode(name, {}, 0))
+        with RootParallelSearch("alphabeta", workers=2) as parallel:
+            assert parallel(game, game.get_initial_state(), tree_heuristic, -1) == (value, None)
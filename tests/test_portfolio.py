@@ -0,0 +1,16 @@
+import pytest
+from sudoku import SudokuProblem
+from portfolio import DEFAULT_PORTFOLIO, portfolio_solve
+
+# Backjumping rejects the non-binary AllDifferent constraints, but the other configurations still solve the puzzle
+# (the puzzle has several solutions, so any valid one is accepted)
+def test_failing_configuration_loses_the_race():
+    problem = SudokuProblem.from_file('sudoku/sudoku_9x9_1.txt', all_different=True)
+    solution = portfolio_solve(problem, workers=len(DEFAULT_PORTFOLIO))
+    assert solution is not None
+    assert set(solution) == set(problem.variables) and problem.satisfies_constraints(solution)
+
+def test_error_is_raised_if_every_configuration_fails():
+    problem = SudokuProblem.from_file('sudoku/sudoku_4x4_1.txt', all_different=True)
+    with pytest.raises(ValueError):
+        portfolio_solve(problem, [{"backjumping": True}, {"backjumping": True, "nogoods": 10}], workers=2)
@@ -0,0 +1,44 @@
+import os, pickle
+import pytest
+from sudoku import SudokuProblem
+from problem_cache import FORMAT_VERSION, ProblemCache, dumps_problem, loads_problem
+from CSP_solver import solve
+
+def test_round_trip():
+    problem = SudokuProblem.from_file('sudoku/sudoku_9x9_1.txt')
+    loaded = loads_problem(dumps_problem(problem))
+    assert isinstance(loaded, SudokuProblem)
+    assert solve(loaded) == solve(SudokuProblem.from_file('sudoku/sudoku_9x9_1.txt'))
+
+# The compiled view is restored as it was stored (it is not recompiled), and it still shares its objects with the problem
+def test_compiled_view_is_restored():
+    problem = SudokuProblem.from_file('sudoku/sudoku_9x9_2.txt')
+    loaded = loads_problem(dumps_problem(problem))
+    compiled = loaded.__dict__["_compiled"]
+    assert compiled is not None and loaded.compile() is compiled
+    assert all(constraint in loaded.constraints for arcs in compiled.arcs for _, _, constraint, _ in arcs)
+    # the "not equal" constraints still share their support tables
+    count_tables = lambda compiled: len({id(table) for table in compiled.tables.values()})
+    assert count_tables(compiled) == count_tables(problem.compile()) < len(compiled.tables)
+
+# A crafted file can not make the loader import a module or call a function that is not in the allow-list
+def test_unknown_globals_are_rejected():
+    for crafted in ((FORMAT_VERSION, os.getcwd), (FORMAT_VERSION, pickle.PickleError())):
+        with pytest.raises(ValueError):
+            loads_problem(pickle.dumps(crafted))
+
+# A damaged entry is rebuilt (and replaced) instead of failing the load
+def test_corrupted_cache_file_is_rebuilt(tmp_path):
+    with open('sudoku/sudoku_4x4_1.txt') as f:
+        text = f.read()
+    cache = ProblemCache(str(tmp_path))
+    expected = solve(cache.get(text, lambda: SudokuProblem.from_text(text)))
+    path = os.path.join(tmp_path, ProblemCache.key(text) + ".csp")
+    with open(path, 'rb') as f:
+        data = f.read()
+    for corrupted in (b"", data[:len(data) // 2], b"garbage" + data, pickle.dumps((FORMAT_VERSION,)), pickle.dumps(None), pickle.dumps([])):
+        with open(path, 'wb') as f:
+            f.write(corrupted)
+        assert solve(cache.get(text, lambda: SudokuProblem.from_text(text))) == expected
+        with open(path, 'rb') as f:
+            assert f.read() == data
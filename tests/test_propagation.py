@@ -0,0 +1,40 @@
+from CSP import LessThan, Problem
+from CSP_solver import iter_solutions, solve
+from sudoku import SudokuProblem
+
+PUZZLES = ["sudoku/sudoku_4x4_1.txt", "sudoku/sudoku_4x4_2.txt", "sudoku/sudoku_4x4_3.txt", "sudoku/sudoku_4x4_4.txt",
+    "sudoku/sudoku_9x9_2.txt", "sudoku/sudoku_9x9_3.txt"]
+
+# A chain "x0 < x1 < ... < x{count-1}" where every variable takes a value in 1..values
+def chain_problem(count: int, values: int) -> Problem:
+    problem = Problem()
+    problem.variables = [f"x{index}" for index in range(count)]
+    problem.domains = {variable: set(range(1, values + 1)) for variable in problem.variables}
+    problem.constraints = [LessThan(pair) for pair in zip(problem.variables, problem.variables[1:])]
+    return problem
+
+def solution_set(problem: Problem, propagation: str) -> set:
+    return {frozenset(solution.items()) for solution in iter_solutions(problem, propagation=propagation)}
+
+# Arc consistency only removes the values that can not be part of a solution, so it finds the same solutions as forward checking
+def test_arc_consistency_finds_the_same_solutions():
+    for path in PUZZLES:
+        expected = solution_set(SudokuProblem.from_file(path), "forward_checking")
+        for propagation in ("ac3", "ac2001"):
+            assert solution_set(SudokuProblem.from_file(path), propagation) == expected
+    for propagation in ("ac3", "ac2001"):
+        assert solution_set(chain_problem(4, 5), propagation) == solution_set(chain_problem(4, 5), "forward_checking")
+
+# Arc consistency prunes at least the values that forward checking prunes, so it never explores more nodes
+def test_arc_consistency_explores_fewer_nodes():
+    for path in PUZZLES + ["sudoku/sudoku_9x9_1.txt"]:
+        _, fc = solve(SudokuProblem.from_file(path), "forward_checking", return_stats=True)
+        for propagation in ("ac3", "ac2001"):
+            _, ac = solve(SudokuProblem.from_file(path), propagation, return_stats=True)
+            assert ac.nodes <= fc.nodes
+    # 4x4_4 and a chain of 3 variables over 2 values are proved unsolvable before the search, while forward checking has to search
+    for problem in (lambda: SudokuProblem.from_file("sudoku/sudoku_4x4_4.txt"), lambda: chain_problem(3, 2)):
+        assert solve(problem(), "forward_checking", return_stats=True)[1].nodes > 0
+        for propagation in ("ac3", "ac2001"):
+            result, stats = solve(problem(), propagation, return_stats=True)
+            assert result is None and stats.nodes == 0
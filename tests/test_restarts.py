@@ -0,0 +1,17 @@
+from CSP_solver import solve
+from sudoku import SudokuProblem
+from test_solver_stats import coloring_problem
+
+# The random tie-breaking is seeded, so the same seed explores the same runs and returns the same solution.
+# The small node limits force several restarts, and the search is still complete (it proves that 5 nodes can not be 4-colored).
+def test_restarts_are_reproducible():
+    for strategy in ("luby", "geometric"):
+        for seed in (0, 7):
+            runs = [solve(SudokuProblem.from_file("sudoku/sudoku_9x9_3.txt"), restarts=strategy, restart_base=5, seed=seed, return_stats=True)
+                for _ in range(2)]
+            (first, first_stats), (second, second_stats) = runs
+            assert first == second and first_stats.nodes == second_stats.nodes and first_stats.restarts == second_stats.restarts > 0
+            assert SudokuProblem.from_file("sudoku/sudoku_9x9_3.txt").satisfies_constraints(first)
+            colors = ["red", "green", "blue", "yellow"]
+            result, stats = solve(coloring_problem(5, 4, colors), restarts=strategy, restart_base=5, seed=seed, return_stats=True)
+            assert result is None and stats.restarts > 0
@@ -0,0 +1,20 @@
+import glob
+from CSP_solver import count_solutions, iter_solutions
+from sudoku import SudokuProblem
+
+# The exact cover solver is an independent implementation, so both solvers must enumerate the same solutions
+def test_solutions_agree_with_dlx():
+    for path in sorted(glob.glob("sudoku/sudoku_4x4_*.txt")) + ["sudoku/sudoku_9x9_2.txt", "sudoku/sudoku_9x9_3.txt"]:
+        expected = {frozenset(solution.items()) for solution in SudokuProblem.from_file(path).iter_dlx_solutions()}
+        for encoding in ({}, {"all_different": True}):
+            solutions = [frozenset(solution.items()) for solution in iter_solutions(SudokuProblem.from_file(path, **encoding))]
+            assert len(solutions) == len(set(solutions)) and set(solutions) == expected
+            assert count_solutions(SudokuProblem.from_file(path, **encoding)) == len(expected)
+
+# 9x9_1 has too many solutions to enumerate, so only the first ones are counted (the enumeration stops at the limit)
+def test_limited_counts():
+    problem = lambda: SudokuProblem.from_file("sudoku/sudoku_9x9_1.txt")
+    for limit in (1, 2, 50):
+        assert count_solutions(problem(), limit) == len(list(problem().iter_dlx_solutions(limit))) == limit
+        assert len(list(iter_solutions(problem(), limit))) == limit
+    assert count_solutions(problem(), 0) == 0
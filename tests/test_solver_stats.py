@@ -0,0 +1,26 @@
+import itertools
+from CSP import NotEqual, Problem
+from CSP_solver import solve
+
+# Colors a graph where every pair of the first "clique" nodes are neighbors (so it is unsolvable if clique > len(colors))
+# and the other nodes form a ring around them. The colors are strings, so the domains are not BitDomains and are not tabulated.
+def coloring_problem(clique: int, ring: int, colors: list) -> Problem:
+    problem = Problem()
+    problem.variables = [f"c{i}" for i in range(clique)] + [f"r{i}" for i in range(ring)]
+    problem.domains = {variable: set(colors) for variable in problem.variables}
+    edges = list(itertools.combinations(problem.variables[:clique], 2))
+    edges += [(f"r{i}", f"r{(i + 1) % ring}") for i in range(ring)]
+    edges += [(f"r{i}", f"c{i % clique}") for i in range(ring)]
+    problem.constraints = [NotEqual(edge) for edge in edges]
+    return problem
+
+# AC-3 and AC-2001 reach the same arc consistent domains, so they prune the same values
+# (AC-2001 also trails its support pointers, which must not be counted as pruned values)
+def test_pruned_values_are_the_same_for_ac3_and_ac2001():
+    colors = ["red", "green", "blue", "yellow"]
+    for clique, ring in ((4, 6), (5, 4)):
+        ac3 = solve(coloring_problem(clique, ring, colors), "ac3", return_stats=True)
+        ac2001 = solve(coloring_problem(clique, ring, colors), "ac2001", return_stats=True)
+        assert ac3[0] == ac2001[0]
+        assert ac3[1].nodes == ac2001[1].nodes
+        assert ac3[1].pruned == ac2001[1].pruned > 0
@@ -0,0 +1,35 @@
+from dungeon import DungeonGame, dungeon_heuristic
+from transposition import TranspositionTable
+from tree import TreeGame, tree_heuristic
+import search
+
+GAMES = [(TreeGame.from_file(f"trees/tree{index}.json"), tree_heuristic) for index in (1, 2)]
+GAMES += [(DungeonGame.from_file(f"dungeons/dungeon{level}.txt"), dungeon_heuristic) for level in (1, 2, 3, 4)]
+
+# The table only returns the values of the same state searched to the same depth, so the searches return the same values and actions.
+# A tiny table is also used to check that the replaced entries do not change the results, and the tables are shared between the searches.
+def test_same_results_as_without_table():
+    for search_fn, depths in ((search.alphabeta, (1, 3, 5)), (search.expectimax, (1, 3))):
+        for game, heuristic in GAMES:
+            state = game.get_initial_state()
+            tables = [TranspositionTable(), TranspositionTable(16)]
+            for depth in depths:
+                expected = search_fn(game, state, heuristic, depth)
+                for table in tables:
+                    table.new_search()
+                    assert search_fn(game, state, heuristic, depth, table) == expected
+
+# The incremental hash of a successor (from the features changed by the action) is the same as its hash from all its features
+def test_child_hash_matches_full_hash():
+    table = TranspositionTable()
+    for game, _ in GAMES:
+        states = [game.get_initial_state()]
+        for _ in range(4):
+            children = []
+            for state in states:
+                if game.is_terminal(state)[0]: continue
+                key = table.hash(game, state)
+                for action, child in game.get_successors(state):
+                    assert table.child_hash(game, key, state, action, child) == table.hash(game, child)
+                    children.append(child)
+            states = children[:50]
@@ -0,0 +1,34 @@
+import glob
+from CSP import NotEqual, Problem
+from CSP_solver import SearchHook, solve
+from sudoku import SudokuProblem
+from test_solver_stats import coloring_problem
+
+# Records the assignment of every explored node (so two searches that select the same variables record the same list)
+class RecordNodes(SearchHook):
+    def __init__(self) -> None:
+        self.assignments = []
+
+    def node(self, assignment):
+        self.assignments.append(dict(assignment))
+
+def explored_assignments(problem: Problem, variable_ordering: str) -> list:
+    recorder = RecordNodes()
+    solve(problem, variable_ordering=variable_ordering, hooks=[recorder])
+    return recorder.assignments
+
+# The bucket queue selects the same variable as the scan at every node (including the ties that follow "problem.variables")
+def test_mrv_bucket_selects_the_same_variables_as_mrv():
+    problems = [SudokuProblem.from_file(path) for path in sorted(glob.glob("sudoku/*.txt"))]
+    problems += [coloring_problem(4, 6, ["red", "green", "blue", "yellow"]), coloring_problem(5, 4, ["red", "green", "blue", "yellow"])]
+    for problem in problems:
+        assert explored_assignments(problem, "mrv_bucket") == explored_assignments(problem, "mrv")
+
+# All the domains have the same size, so MRV follows "problem.variables" while the degree tie-break starts with the center of the star
+def test_mrv_degree_breaks_ties_by_degree():
+    problem = Problem()
+    problem.variables = ["a", "b", "c", "center"]
+    problem.domains = {variable: {1, 2, 3} for variable in problem.variables}
+    problem.constraints = [NotEqual(("center", leaf)) for leaf in "abc"]
+    assert list(explored_assignments(problem, "mrv")[1]) == ["a"]
+    assert list(explored_assignments(problem, "mrv_degree")[1]) == ["center"]
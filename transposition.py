@@ -0,0 +1,125 @@
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+from game import Game, S, A
+from helpers.mt19937 import RandomGenerator
+
+# A transposition table for the game searches (see "search.py").
+# The same state is often reached through different move orders (e.g. the player steps left then right while a monster waits),
+# so the table remembers the result of every searched state and the searches reuse it instead of expanding the state again.
+# The states are keyed by their Zobrist hash: each feature of a state (e.g. "the player is at (2, 3)" or "it is the turn of agent 1")
+# has a random 64-bit key and the hash of a state is the XOR of the keys of its features. A move only changes a few features,
+# so the hash of a successor is computed from the hash of its parent by XORing the keys of the features that changed
+# (see "Game.get_features" and "Game.get_changed_features").
+
+# The bound types of the stored values: the exact value, a lower bound (the search failed high) or an upper bound (it failed low)
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# The random 64-bit keys of the features, generated the first time each feature is seen
+class ZobristKeys:
+    def __init__(self, seed: int = 0) -> None:
+        self.rng = RandomGenerator(seed)
+        self.keys: Dict[Hashable, int] = {}
+
+    def __getitem__(self, feature: Hashable) -> int:
+        key = self.keys.get(feature)
+        if key is None:
+            key = self.keys[feature] = (self.rng.generate() << 32) | self.rng.generate()
+        return key
+
+    # Returns the XOR of the keys of the given features
+    def combine(self, features: Iterable[Hashable]) -> int:
+        result = 0
+        for feature in features:
+            result ^= self[feature]
+        return result
+
+# A bounded table of search results. Each entry holds the hash of its state, the remaining depth it was searched to,
+# the value (with its bound type) and the best move. An entry is only used for the same remaining depth since a deeper or
+# shallower search can return a different value (so using the table never changes the results of a search).
+# The table has a fixed number of slots (a power of 2) and each state maps to one slot. When two states collide,
+# the new entry replaces the old one if the old one is from a previous search (see "new_search") or was not searched deeper.
+class TranspositionTable:
+    probes: int         # The number of lookups
+    hits: int           # The number of lookups that found an entry of the same state and depth
+    cutoffs: int        # The number of hits whose value could be returned (an exact value or a bound outside the search window)
+    stores: int         # The number of stored entries
+    replacements: int   # The number of stored entries that replaced the entry of another state
+
+    def __init__(self, size: int = 1 << 16, seed: int = 0) -> None:
+        if size < 1:
+            raise ValueError(f"The size of the table must be positive, got {size}")
+        self.size = 1 << (size - 1).bit_length() # round up to a power of 2
+        self.mask = self.size - 1
+        self.keys = ZobristKeys(seed)
+        self.entries: List[Optional[Tuple[int, int, int, float, int, Any]]] = [None] * self.size
+        self.generation = 0
+        self.probes = self.hits = self.cutoffs = self.stores = self.replacements = 0
+
+    # The fraction of the lookups that found an entry
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    # Start a new search (e.g. the next move of a game). The entries of the previous searches stay valid but they are replaced first.
+    def new_search(self) -> None:
+        self.generation += 1
+
+    # Remove all the entries and reset the counters
+    def clear(self) -> None:
+        self.entries = [None] * self.size
+        self.generation = 0
+        self.probes = self.hits = self.cutoffs = self.stores = self.replacements = 0
+
+    # Returns the hash of a state (computed from all its features)
+    def hash(self, game: Game[S, A], state: S) -> int:
+        return self.keys.combine(game.get_features(state))
+
+    # Returns the hash of the successor "child" of a state whose hash is "key" (computed from the features changed by the action)
+    def child_hash(self, game: Game[S, A], key: int, state: S, action: A, child: S) -> int:
+        return key ^ self.keys.combine(game.get_changed_features(state, action, child))
+
+    # The key of a state searched to a certain depth (all the negative depths mean that the search is not limited)
+    def __depth_key(self, key: int, depth: int) -> Tuple[int, int]:
+        depth = max(depth, -1)
+        return key ^ self.keys[("depth", depth)], depth
+
+    # Returns the stored (value, move) of a state if it can be used inside the search window [alpha, beta], or None otherwise
+    def lookup(self, key: int, depth: int, alpha: float = float("-inf"), beta: float = float("inf")) -> Optional[Tuple[float, Any]]:
+        self.probes += 1
+        key, depth = self.__depth_key(key, depth)
+        entry = self.entries[key & self.mask]
+        if entry is None or entry[0] != key or entry[1] != depth: return None
+        self.hits += 1
+        _, _, _, value, bound, move = entry
+        if bound == EXACT or (bound == LOWER and value >= beta) or (bound == UPPER and value <= alpha):
+            self.cutoffs += 1
+            return value, move
+        return None
+
+    # Returns the best move stored for a state searched to the given depth (or to one less, e.g. by the previous iteration of
+    # iterative deepening), or None. It is only used to order the moves, so even the entries whose bounds can not be returned are used.
+    def best_move(self, key: int, depth: int) -> Any:
+        for entry_depth in ((depth, depth - 1) if depth > 0 else (depth,)):
+            entry_key, entry_depth = self.__depth_key(key, entry_depth)
+            entry = self.entries[entry_key & self.mask]
+            if entry is not None and entry[0] == entry_key:
+                return entry[5]
+        return None
+
+    # Store the value returned by a search with the window [alpha, beta] (its bound type is deduced from the window)
+    def store(self, key: int, depth: int, value: float, move: Any, alpha: float = float("-inf"), beta: float = float("inf")) -> None:
+        key, depth = self.__depth_key(key, depth)
+        bound = UPPER if value <= alpha else LOWER if value >= beta else EXACT
+        index = key & self.mask
+        entry = self.entries[index]
+        if entry is not None and entry[0] != key:
+            # keep the old entry if it is from this search and it was searched deeper (it saved more work)
+            old_depth = float("inf") if entry[1] < 0 else entry[1]
+            new_depth = float("inf") if depth < 0 else depth
+            if entry[2] == self.generation and old_depth > new_depth: return
+            self.replacements += 1
+        self.entries[index] = (key, depth, self.generation, value, bound, move)
+        self.stores += 1
+
+    def __str__(self) -> str:
+        return (f"{self.hits}/{self.probes} hits ({100 * self.hit_rate:.1f}%), {self.cutoffs} cutoffs, "
+                f"{self.stores} stores, {self.replacements} replacements")
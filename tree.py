@@ -106,6 +106,13 @@ class TreeGame(Game[List, str]):
     def get_successor(self, state: TreeNode, action: str) -> TreeNode:
         return state.children[action]
     
+    # The name of a node is its path from the root, so it identifies the node (used by the transposition tables)
+    def get_features(self, state: TreeNode) -> Iterable[str]:
+        return (state.name,)
+
+    def get_changed_features(self, state: TreeNode, action: str, successor: TreeNode) -> Iterable[str]:
+        return (state.name, successor.name)
+
     # create a tree game from a path to a tree file
     @staticmethod
     def from_file(path: str) -> 'TreeGame':